@@ -0,0 +1,8 @@
+import logging
+from battleship.batch_simulator import *
+from battleship.player import *
+
+logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+
+game = BatchGameSimulator(ProbabilityPlayer, num_simulation=1000, batch_size=100)
+game.start()
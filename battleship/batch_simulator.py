@@ -0,0 +1,107 @@
+import logging
+import time
+from .exception import *
+from .game_status import GameStatus
+from .metrics import MetricsServer, SimulationMetrics
+from .player import RandomPlayer
+from .rng import ROLE_DEFENCE, ROLE_OFFENCE, game_rng, make_run_seed
+from .telemetry import ShotTelemetry
+
+logger = logging.getLogger(__name__)
+
+
+class BatchGameSimulator:
+    SIZE_X = 10
+    SIZE_Y = 10
+
+    def __init__(self, player_factory, num_simulation=1000, batch_size=100, seed=None, corpus=None,
+                 shot_deadline=None, deadline_policy=ShotTelemetry.DEADLINE_POLICY_IGNORE, metrics_port=None,
+                 first_game=0):
+        # Headless counterpart of SingleOffenceGameSimulator that plays batch_size games in lockstep,
+        # so that players can decide for all of them at once through Player.shoot_batch()
+        self.player_factory = player_factory
+        self.npc_player = RandomPlayer()
+        self.num_simulation = num_simulation
+        self.batch_size = batch_size
+        self.seed = seed
+        self.corpus = corpus  # Boards of the games played here, in order
+        # Games are numbered from first_game, so a shard of a run plays exactly the games of the whole run
+        self.first_game = first_game
+        self.game_num = 0
+        self.win_statistics = [0] * 100
+        self.telemetry = ShotTelemetry(shot_deadline=shot_deadline, deadline_policy=deadline_policy)
+        self.metrics_port = metrics_port  # Serves live metrics over HTTP while the simulation runs
+        self.metrics = None
+        self.metrics_server = None
+
+    def new_game(self):
+        game_num = self.first_game + self.game_num
+        player_game_status = GameStatus(BatchGameSimulator.SIZE_X, BatchGameSimulator.SIZE_Y)
+        npc_game_status = GameStatus(BatchGameSimulator.SIZE_X, BatchGameSimulator.SIZE_Y)
+        if self.corpus is not None:
+            npc_game_status.set_defence_board(self.corpus[self.game_num % len(self.corpus)])
+        else:
+            self.npc_player.update_game_status(npc_game_status)
+            self.npc_player.update_rng(game_rng(self.seed, game_num, ROLE_DEFENCE))
+            npc_game_status.set_defence_board(self.npc_player.place_ships())
+        self.game_num += 1
+
+        player = self.player_factory()
+        player.update_game_status(player_game_status)
+        player.update_rng(game_rng(self.seed, game_num, ROLE_OFFENCE))
+        player.reset()
+        player.update_shot_deadline(self.telemetry.shot_deadline)
+        return player, player_game_status, npc_game_status
+
+    def run_batch(self, num_games):
+        setup_start = time.perf_counter()
+        games = [self.new_game() for _ in range(num_games)]
+        if self.metrics is not None:
+            self.metrics.record_phase('setup', time.perf_counter() - setup_start)
+        while len(games) > 0:
+            shoot_start = time.perf_counter()
+            shots = self.telemetry.timed_shoot_batch([player for player, _, _ in games])
+            resolve_start = time.perf_counter()
+            for (player, player_game_status, npc_game_status), shot in zip(games, shots):
+                try:
+                    shot_result, ship_sunk, sunken_ship_type = npc_game_status.add_defence_shot(shot)
+                    shot_idx = player_game_status.add_offence_shot(shot, shot_result, ship_sunk, sunken_ship_type)
+                    player.on_shot_result(shot_idx, shot_result, sunken_ship_type)
+                    if player_game_status.game_over:
+                        self.win_statistics[player_game_status.offence_turn - 2] += 1
+                        if self.metrics is not None:
+                            self.metrics.record_game(player_game_status.offence_turn - 1)
+                except InvalidShotException as e:
+                    logger.warning(e)
+            if self.metrics is not None:
+                self.metrics.record_phase('shoot', resolve_start - shoot_start)
+                self.metrics.record_phase('resolve', time.perf_counter() - resolve_start)
+                self.metrics.record_shots(len(shots))
+            games = [game for game in games if not game[1].game_over]
+
+    def start(self):
+        logger.info('BatchGameSimulator starts.')
+        logger.info(f"{self.player_factory}")
+        logger.info(f"{self.num_simulation} Games")
+
+        if self.metrics_port is not None:
+            self.metrics = SimulationMetrics()
+            self.metrics_server = MetricsServer(self.metrics, port=self.metrics_port)
+            self.metrics_server.start()
+
+        if self.seed is None:
+            self.seed = make_run_seed()
+        logger.info(f"Seed {self.seed}, games {self.first_game}~{self.first_game + self.num_simulation - 1}")
+
+        remaining = self.num_simulation
+        while remaining > 0:
+            num_games = min(self.batch_size, remaining)
+            self.run_batch(num_games)
+            remaining -= num_games
+
+        logger.info(self.win_statistics)
+        logger.info(self.telemetry.export())
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        logger.info('BatchGameSimulator ends.')
+        return self.win_statistics
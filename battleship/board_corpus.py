@@ -0,0 +1,62 @@
+import logging
+from .exception import InvalidShipPlacementException
+from .game_status import GameStatus
+from .rng import ROLE_DEFENCE, game_rng, make_run_seed
+
+logger = logging.getLogger(__name__)
+
+
+class BoardCorpus:
+    # A corpus file holds one defence board per line, as a string of markers in index order
+    SIZE_X = 10
+    SIZE_Y = 10
+
+    def __init__(self, size_x=SIZE_X, size_y=SIZE_Y, ships_and_sizes=None):
+        self.size_x = size_x
+        self.size_y = size_y
+        self.ships_and_sizes = ships_and_sizes
+        self.boards = []
+
+    def __len__(self):
+        return len(self.boards)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            corpus = BoardCorpus(self.size_x, self.size_y, self.ships_and_sizes)
+            corpus.boards = self.boards[index]
+            return corpus
+        return list(self.boards[index])
+
+    def add_boards(self, boards):
+        boards = [''.join(board) for board in boards]
+        # Stored corpora are often full of repeats, which only need to be validated once
+        unique_boards = list(set(boards))
+        results = GameStatus.verify_boards(unique_boards, self.size_x, self.size_y, self.ships_and_sizes)
+        invalid = {board for board, valid in zip(unique_boards, results) if not valid}
+        if len(invalid) > 0:
+            for num, board in enumerate(boards):
+                if board in invalid:
+                    raise InvalidShipPlacementException(f"Invalid board #{len(self.boards) + num + 1}, {board}")
+        self.boards.extend(boards)
+
+    def load(self, path):
+        with open(path) as f:
+            self.add_boards([line.strip() for line in f if len(line.strip()) > 0])
+        logger.info(f"{len(self.boards)} boards loaded from {path}")
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            for board in self.boards:
+                f.write(board + '\n')
+
+    def generate(self, player, num_boards, seed=None):
+        # Board n is the one game n of a simulation with the same seed is played on
+        if seed is None:
+            seed = make_run_seed()
+        game_status = GameStatus(self.size_x, self.size_y, self.ships_and_sizes)
+        player.update_game_status(game_status)
+        boards = []
+        for game_num in range(num_boards):
+            player.update_rng(game_rng(seed, game_num, ROLE_DEFENCE))
+            boards.append(player.place_ships())
+        self.add_boards(boards)
@@ -0,0 +1,309 @@
+import collections
+import functools
+import json
+import logging
+import socket
+import socketserver
+import threading
+import time
+from . import player as player_module
+from .batch_simulator import BatchGameSimulator
+from .board_corpus import BoardCorpus
+from .metrics import MetricsServer, SimulationMetrics
+from .rng import make_run_seed
+
+logger = logging.getLogger(__name__)
+
+# Coordinator and workers talk in JSON lines:
+#   worker      -> {"type": "hello", "worker": name}
+#   coordinator -> {"type": "task", "unit": ..., "player": ..., "config": ..., "seed": ..., "first_game": ..., ...}
+#   worker      -> {"type": "result", "unit": ..., "win_statistics": [...], "elapsed": ...}
+#                  or {"type": "error", "unit": ..., "message": ...} when the unit failed
+#   coordinator -> {"type": "done"} once every unit has a result, or failed too often
+MESSAGE_HELLO = 'hello'
+MESSAGE_TASK = 'task'
+MESSAGE_RESULT = 'result'
+MESSAGE_ERROR = 'error'
+MESSAGE_DONE = 'done'
+
+
+def send_message(wfile, message):
+    wfile.write((json.dumps(message) + '\n').encode())
+    wfile.flush()
+
+
+def receive_message(rfile):
+    line = rfile.readline()
+    if not line:
+        return None  # Connection closed
+    return json.loads(line)
+
+
+class CoordinatorRequestHandler(socketserver.StreamRequestHandler):
+    # One connection per worker, which holds at most one unit at a time
+    def handle(self):
+        coordinator = self.server.coordinator
+        worker = coordinator.register_worker(self.client_address)
+        try:
+            hello = receive_message(self.rfile)
+            if hello is None or hello.get('type') != MESSAGE_HELLO:
+                return
+            logger.info(f"Worker {worker} joined, {hello.get('worker')} at {self.client_address}")
+            while True:
+                task = coordinator.get_task(worker)
+                if task is None:
+                    send_message(self.wfile, {'type': MESSAGE_DONE})
+                    break
+                send_message(self.wfile, task)
+                result = receive_message(self.rfile)
+                if result is None:
+                    break
+                if result['type'] == MESSAGE_ERROR:
+                    coordinator.put_error(worker, result)
+                else:
+                    coordinator.put_result(worker, result)
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Worker {worker}: {e}")
+        finally:
+            coordinator.release_worker(worker)
+
+
+class DistributedCoordinator:
+    # Splits a run into units of consecutive games, hands them out to workers over TCP and merges
+    # the win_statistics they send back. A unit is leased to one worker at a time: it goes back to the
+    # queue when its worker disconnects, or when the lease times out. A unit that fails on a worker is
+    # retried, and dropped from the run once it failed max_attempts times.
+    PORT = 8750
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, player_class, player_config=None, num_simulation=1000, unit_size=100, seed=0, corpus=None,
+                 host='localhost', port=PORT, lease_timeout=600, metrics_port=None, max_attempts=MAX_ATTEMPTS):
+        self.player_class = player_class
+        self.player_config = player_config if player_config is not None else {}
+        self.num_simulation = num_simulation
+        self.unit_size = unit_size
+        # Resolved once here, as workers may ask for tasks as soon as the coordinator listens
+        self.seed = seed if seed is not None else make_run_seed()
+        self.corpus = corpus
+        self.host = host
+        self.port = port
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+
+        # Units as (first game, number of games)
+        self.units = [
+            (first_game, min(unit_size, num_simulation - first_game))
+            for first_game in range(0, num_simulation, unit_size)
+        ]
+        self.pending = collections.deque(range(len(self.units)))
+        self.leases = {}  # unit -> (worker, expiry time)
+        self.results = {}
+        self.failures = {}  # unit -> error messages so far
+        self.failed_units = {}  # Dropped units -> their last error message
+        self.num_workers = 0
+        self.condition = threading.Condition()
+        self.win_statistics = [0] * 100
+        self.server = None
+        self.metrics_port = metrics_port
+        self.metrics = None
+        self.metrics_server = None
+
+    def register_worker(self, address):
+        with self.condition:
+            self.num_workers += 1
+            return self.num_workers
+
+    def make_task(self, unit):
+        first_game, num_games = self.units[unit]
+        task = {
+            'type': MESSAGE_TASK,
+            'unit': unit,
+            'player': self.player_class.__name__,
+            'config': self.player_config,
+            'seed': self.seed,
+            'first_game': first_game,
+            'num_games': num_games,
+            'boards': None,
+        }
+        if self.corpus is not None:
+            # The slice of the corpus the same games would have used in a single run
+            task['boards'] = [
+                self.corpus.boards[(first_game + game) % len(self.corpus)] for game in range(num_games)
+            ]
+            task['size_x'] = self.corpus.size_x
+            task['size_y'] = self.corpus.size_y
+            task['ships_and_sizes'] = self.corpus.ships_and_sizes
+        return task
+
+    def get_task(self, worker):
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                for unit, (lease_worker, expiry) in list(self.leases.items()):
+                    if expiry < now:
+                        logger.warning(f"Lease of unit {unit} by worker {lease_worker} expired")
+                        del self.leases[unit]
+                        self.pending.appendleft(unit)
+                if self.is_done():
+                    return None
+                if len(self.pending) > 0:
+                    unit = self.pending.popleft()
+                    self.leases[unit] = (worker, now + self.lease_timeout)
+                    return self.make_task(unit)
+                # Every unit left is leased, wait in case one comes back
+                self.condition.wait(timeout=1)
+
+    def is_done(self):
+        return len(self.results) + len(self.failed_units) == len(self.units)
+
+    def put_result(self, worker, result):
+        with self.condition:
+            unit = result['unit']
+            # A late result of a reassigned unit is as good as the first one, but only counts once
+            if unit not in self.results:
+                self.results[unit] = result
+                self.win_statistics = [
+                    total + count for total, count in zip(self.win_statistics, result['win_statistics'])
+                ]
+                if self.metrics is not None:
+                    self.metrics.record_win_statistics(result['win_statistics'])
+                    self.metrics.record_phase('unit', result['elapsed'])
+                logger.info(f"Unit {unit} done by worker {worker}, {len(self.results)}/{len(self.units)}")
+            if unit in self.leases and self.leases[unit][0] == worker:
+                del self.leases[unit]
+            self.condition.notify_all()
+
+    def put_error(self, worker, error):
+        with self.condition:
+            unit = error['unit']
+            if unit in self.leases and self.leases[unit][0] == worker:
+                del self.leases[unit]
+            if unit not in self.results and unit not in self.failed_units:
+                self.failures.setdefault(unit, []).append(error['message'])
+                if len(self.failures[unit]) >= self.max_attempts:
+                    # The unit fails wherever it runs, so it would stall the run
+                    logger.error(f"Unit {unit} dropped after {len(self.failures[unit])} attempts: {error['message']}")
+                    self.failed_units[unit] = error['message']
+                    if unit in self.pending:
+                        self.pending.remove(unit)
+                    if unit in self.leases:
+                        del self.leases[unit]
+                else:
+                    logger.warning(f"Unit {unit} failed on worker {worker}: {error['message']}")
+                    if unit not in self.pending and unit not in self.leases:
+                        self.pending.append(unit)
+            self.condition.notify_all()
+
+    def release_worker(self, worker):
+        with self.condition:
+            for unit, (lease_worker, expiry) in list(self.leases.items()):
+                if lease_worker == worker:
+                    logger.warning(f"Worker {worker} left, unit {unit} is reassigned")
+                    del self.leases[unit]
+                    self.pending.appendleft(unit)
+            self.condition.notify_all()
+
+    def listen(self):
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((self.host, self.port), CoordinatorRequestHandler)
+        self.server.daemon_threads = True
+        self.server.coordinator = self
+        self.port = self.server.server_address[1]  # Port 0 picks a free one
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def start(self):
+        logger.info('DistributedCoordinator starts.')
+        logger.info(f"{self.player_class.__name__} {self.player_config}")
+        logger.info(f"{self.num_simulation} Games in {len(self.units)} units")
+        logger.info(f"Seed {self.seed}")
+        if self.metrics_port is not None:
+            self.metrics = SimulationMetrics()
+            self.metrics_server = MetricsServer(self.metrics, port=self.metrics_port)
+            self.metrics_server.start()
+        if self.server is None:
+            self.listen()
+        logger.info(f"Listening on {self.host}:{self.port}")
+
+        start = time.perf_counter()
+        with self.condition:
+            while not self.is_done():
+                self.condition.wait(timeout=1)
+        elapsed = time.perf_counter() - start
+
+        self.server.shutdown()
+        self.server.server_close()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        logger.info(self.win_statistics)
+        if len(self.failed_units) > 0:
+            logger.error(f"{len(self.failed_units)} of {len(self.units)} units failed, "
+                         f"their games are missing: {sorted(self.failed_units)}")
+        logger.info(f"{self.num_simulation / elapsed:.1f} games/s")
+        logger.info('DistributedCoordinator ends.')
+        return self.win_statistics
+
+
+class DistributedWorker:
+    def __init__(self, host='localhost', port=DistributedCoordinator.PORT, name=None, connect_timeout=30):
+        self.host = host
+        self.port = port
+        self.name = name if name is not None else socket.gethostname()
+        self.connect_timeout = connect_timeout  # Seconds to wait for the coordinator to come up
+        self.num_units = 0
+
+    def connect(self):
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return socket.create_connection((self.host, self.port))
+            except OSError:
+                # Refused, timed out or unreachable while the coordinator comes up
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.5)
+
+    @staticmethod
+    def run_task(task):
+        # Only players of battleship.player can be asked for
+        player_class = getattr(player_module, task['player'], None)
+        if not isinstance(player_class, type) or not issubclass(player_class, player_module.Player):
+            raise ValueError(f"Unknown player, {task['player']}")
+        corpus = None
+        if task['boards'] is not None:
+            corpus = BoardCorpus(task['size_x'], task['size_y'], task['ships_and_sizes'])
+            corpus.add_boards(task['boards'])
+
+        simulator = BatchGameSimulator(
+            functools.partial(player_class, **task['config']),
+            num_simulation=task['num_games'], seed=task['seed'], corpus=corpus, first_game=task['first_game'],
+        )
+        start = time.perf_counter()
+        win_statistics = simulator.start()
+        return {
+            'type': MESSAGE_RESULT,
+            'unit': task['unit'],
+            'win_statistics': win_statistics,
+            'elapsed': time.perf_counter() - start,
+        }
+
+    def start(self):
+        logger.info(f"DistributedWorker {self.name} starts.")
+        with self.connect() as sock:
+            rfile = sock.makefile('rb')
+            wfile = sock.makefile('wb')
+            send_message(wfile, {'type': MESSAGE_HELLO, 'worker': self.name})
+            while True:
+                message = receive_message(rfile)
+                if message is None or message['type'] == MESSAGE_DONE:
+                    break
+                try:
+                    result = DistributedWorker.run_task(message)
+                except Exception as e:
+                    # The coordinator decides whether the unit is retried, the worker takes the next one
+                    logger.exception(f"Unit {message['unit']} failed")
+                    send_message(wfile, {'type': MESSAGE_ERROR, 'unit': message['unit'], 'message': repr(e)})
+                    continue
+                send_message(wfile, result)
+                self.num_units += 1
+        logger.info(f"DistributedWorker {self.name} ends, {self.num_units} units done.")
+        return self.num_units
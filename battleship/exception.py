@@ -12,3 +12,7 @@ class InvalidShotException(BattleshipException):
 
 class QuitGameException(BattleshipException):
     pass
+
+
+class ShotDeadlineExceededException(BattleshipException):
+    pass
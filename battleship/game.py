@@ -2,6 +2,8 @@ import logging
 from .exception import *
 from .game_status import GameStatus
 from .player import RandomPlayer
+from .rng import ROLE_DEFENCE, ROLE_OFFENCE, game_rng, make_run_seed
+from .telemetry import ShotTelemetry
 
 logger = logging.getLogger(__name__)
 
@@ -10,26 +12,37 @@ class SingleOffenceGame:
     SIZE_X = 10
     SIZE_Y = 10
 
-    def __init__(self, player):
+    def __init__(self, player, shot_deadline=None, deadline_policy=ShotTelemetry.DEADLINE_POLICY_IGNORE, seed=None):
         self.player = player
+        self.seed = seed
         self.npc_player = RandomPlayer()
         self.player_game_status = None
         self.npc_game_status = None
+        self.telemetry = ShotTelemetry(shot_deadline=shot_deadline, deadline_policy=deadline_policy)
 
     def start(self):
+        if self.seed is None:
+            self.seed = make_run_seed()
+        logger.info(f"Seed {self.seed}")
         self.player_game_status = GameStatus(SingleOffenceGame.SIZE_X, SingleOffenceGame.SIZE_Y)
         self.npc_game_status = GameStatus(SingleOffenceGame.SIZE_X, SingleOffenceGame.SIZE_Y)
         self.npc_player.update_game_status(self.npc_game_status)
+        self.npc_player.update_rng(game_rng(self.seed, 0, ROLE_DEFENCE))
         self.npc_game_status.set_defence_board(self.npc_player.place_ships())
         self.player.update_game_status(self.player_game_status)
+        self.player.update_rng(game_rng(self.seed, 0, ROLE_OFFENCE))
+        self.player.reset()
+        self.player.update_shot_deadline(self.telemetry.shot_deadline)
         while not self.player_game_status.game_over:
             self.player_game_status.print_offence_board()
-            shot = self.player.shoot()
+            shot = self.telemetry.timed_shoot(self.player)
             try:
                 shot_result, ship_sunk, sunken_ship_type = self.npc_game_status.add_defence_shot(shot)
-                self.player_game_status.add_offence_shot(shot, shot_result, ship_sunk, sunken_ship_type)
+                shot_idx = self.player_game_status.add_offence_shot(shot, shot_result, ship_sunk, sunken_ship_type)
+                self.player.on_shot_result(shot_idx, shot_result, sunken_ship_type)
             except InvalidShotException as e:
                 logger.warning(e)
 
         self.player.update_game_status(self.player_game_status)
         self.player_game_status.print_offence_board()
+        logger.info(self.telemetry.export())
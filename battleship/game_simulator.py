@@ -1,11 +1,17 @@
 import logging
-import random
+import os
+import queue
+import threading
+import time
 
 import pygame
 import math
 from .exception import *
 from .game_status import GameStatus
+from .metrics import MetricsServer, SimulationMetrics
 from .player import RandomPlayer, HumanPlayer
+from .rng import ROLE_DEFENCE, ROLE_OFFENCE, game_rng, make_run_seed
+from .telemetry import ShotTelemetry
 
 FORMAT = '%(asctime)s %(message)s'
 logging.basicConfig(format=FORMAT)
@@ -262,13 +268,96 @@ class MessageArea(Area):
         self.messages.insert(0, text)
 
 
+class RenderWorker:
+    # Draws the game events queued by SingleOffenceGameSimulator, so that simulation speed does not
+    # depend on the frame rate. Offscreen frames are saved as numbered PNG files, e.g. for ffmpeg.
+    # It runs on the main thread while the games run in the background, because SDL only supports
+    # the window and its events on the main thread on some platforms, e.g. macOS.
+    EVENT_FRAME = 'frame'
+    EVENT_MESSAGE = 'message'
+    EVENT_STOP = 'stop'
+    EVENT_TIMEOUT = 0.1  # Seconds to wait for a game event before the window events are handled anyway
+
+    def __init__(self, events, offscreen=False, frame_dir=None, fps=None):
+        self.events = events
+        self.offscreen = offscreen
+        self.frame_dir = frame_dir
+        self.fps = fps
+        self.num_frames = 0
+        self.quit = False
+
+    def run(self):
+        try:
+            if self.offscreen:
+                surface = pygame.Surface(SingleOffenceGameSimulator.SCREEN_SIZE)
+            else:
+                surface = pygame.display.set_mode(SingleOffenceGameSimulator.SCREEN_SIZE)
+            if self.frame_dir is not None:
+                os.makedirs(self.frame_dir, exist_ok=True)
+            clock = pygame.time.Clock()
+            board_area = BoardArea(SingleOffenceGameSimulator.SIZE_X, SingleOffenceGameSimulator.SIZE_Y)
+            statistics_area = StatisticsArea()
+            message_area = MessageArea()
+
+            while True:
+                try:
+                    event = self.events.get(timeout=RenderWorker.EVENT_TIMEOUT)
+                except queue.Empty:
+                    # A slow player must not leave the window unresponsive
+                    self.handle_window_events()
+                    continue
+                if event[0] == RenderWorker.EVENT_STOP:
+                    break
+                if event[0] == RenderWorker.EVENT_MESSAGE:
+                    message_area.append_text(event[1])
+                    continue
+
+                _, game_status, win_statistics = event
+                SingleOffenceGameSimulator.draw_screen(
+                    surface, board_area, game_status, statistics_area, win_statistics, message_area
+                )
+                if self.frame_dir is not None:
+                    pygame.image.save(surface, os.path.join(self.frame_dir, f"frame_{self.num_frames:06d}.png"))
+                self.num_frames += 1
+
+                if not self.offscreen:
+                    pygame.display.flip()
+                self.handle_window_events()
+                if self.fps is not None:
+                    clock.tick(self.fps)
+        except QuitGameException:
+            pass
+        finally:
+            self.quit = True
+
+    def handle_window_events(self):
+        if self.offscreen:
+            return
+        for window_event in pygame.event.get():
+            if window_event.type == pygame.QUIT:
+                raise QuitGameException()
+
+
 class SingleOffenceGameSimulator:
     SIZE_X = 10
     SIZE_Y = 10
 
     SCREEN_SIZE = (1920, 1080)
-
-    def __init__(self, player, num_simulation=10, seed=None, tps=None):
+    INPUT_TIMEOUT_MS = 1000  # Longest a human player's turn sleeps without any event
+
+    RENDER_MODE_INLINE = 'inline'  # Draw every shot in the simulation loop
+    RENDER_MODE_THREAD = 'thread'  # Simulate in a background thread, draw to the screen from a RenderWorker
+    RENDER_MODE_OFFSCREEN = 'offscreen'  # As thread, without a display, e.g. to export frames
+    RENDER_MODES = [RENDER_MODE_INLINE, RENDER_MODE_THREAD, RENDER_MODE_OFFSCREEN]
+
+    def __init__(self, player, num_simulation=10, seed=None, tps=None,
+                 shot_deadline=None, deadline_policy=ShotTelemetry.DEADLINE_POLICY_IGNORE, telemetry_path=None,
+                 render_mode=RENDER_MODE_INLINE, frame_dir=None, render_queue_size=64, drop_frames=True,
+                 metrics_port=None):
+        if render_mode not in SingleOffenceGameSimulator.RENDER_MODES:
+            raise ValueError(f"Unknown render mode, {render_mode}")
+        if render_mode != SingleOffenceGameSimulator.RENDER_MODE_INLINE and isinstance(player, HumanPlayer):
+            raise ValueError(f"{render_mode} render mode can not take input from a human player")
         self.player = player
         self.npc_player = RandomPlayer()
         self.player_game_status = None
@@ -278,6 +367,11 @@ class SingleOffenceGameSimulator:
         self.win_statistics = [0] * 100
         self.seed = seed
         self.tps = tps
+        self.telemetry = ShotTelemetry(shot_deadline=shot_deadline, deadline_policy=deadline_policy)
+        self.telemetry_path = telemetry_path
+        self.metrics_port = metrics_port  # Serves live metrics over HTTP while the simulation runs
+        self.metrics = None
+        self.metrics_server = None
 
         # pygame variables
         self.main_surface = None
@@ -286,42 +380,107 @@ class SingleOffenceGameSimulator:
         self.statistics_area = None
         self.message_area = None
 
+        # Render worker variables
+        self.render_mode = render_mode
+        self.frame_dir = frame_dir
+        self.drop_frames = drop_frames  # Skip frames while the worker lags, instead of slowing down the simulation
+        self.render_events = queue.Queue(maxsize=render_queue_size)
+        self.render_worker = None
+        self.dropped_frames = 0
+        self.simulation_error = None  # Raised by the background simulation, re-raised on the main thread
+
     @staticmethod
     def wait_for_press_any_key():
         pygame.display.flip()
-        wait = True
-        while wait:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    raise QuitGameException()
-                if event.type == pygame.KEYDOWN:
-                    wait = False
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    wait = False
+        while True:
+            # Sleeps until the next event
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                raise QuitGameException()
+            if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
+                return
+
+    @staticmethod
+    def draw_screen(surface, board_area, game_status, statistics_area, win_statistics, message_area):
+        surface.fill("black")
+
+        board_area.update(game_status)
+        surface.blit(board_area.surface, (100, 100))
+
+        statistics_area.update(win_statistics)
+        surface.blit(statistics_area.surface, (780, 100))
+
+        message_area.update()
+        surface.blit(message_area.surface, (100, 780))
+
+    def put_render_event(self, event):
+        # Blocks while the queue is full, unless the worker is gone
+        while True:
+            if self.render_worker.quit:
+                raise QuitGameException()
+            try:
+                self.render_events.put(event, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def push_frame(self, final=False):
+        # A fork is a cheap snapshot, later shots copy the boards instead of changing the queued frame
+        event = (RenderWorker.EVENT_FRAME, self.player_game_status.fork(), list(self.win_statistics))
+        if self.drop_frames and not final:
+            if self.render_worker.quit:
+                raise QuitGameException()
+            try:
+                self.render_events.put_nowait(event)
+            except queue.Full:
+                self.dropped_frames += 1
+        else:
+            self.put_render_event(event)
+
+    def append_message(self, text):
+        if self.render_mode == SingleOffenceGameSimulator.RENDER_MODE_INLINE:
+            self.message_area.append_text(text)
+        else:
+            self.put_render_event((RenderWorker.EVENT_MESSAGE, text))
 
     def run_simulation(self):
         self.player_game_status = GameStatus(SingleOffenceGameSimulator.SIZE_X, SingleOffenceGameSimulator.SIZE_Y)
         self.npc_game_status = GameStatus(SingleOffenceGameSimulator.SIZE_X, SingleOffenceGameSimulator.SIZE_Y)
+        # Games are numbered from 0 for the RNG streams, as in BatchGameSimulator
         self.npc_player.update_game_status(self.npc_game_status)
+        self.npc_player.update_rng(game_rng(self.seed, self.game_num - 1, ROLE_DEFENCE))
         self.npc_game_status.set_defence_board(self.npc_player.place_ships())
-        self.player.reset()
         self.player.update_game_status(self.player_game_status)
+        self.player.update_rng(game_rng(self.seed, self.game_num - 1, ROLE_OFFENCE))
+        self.player.reset()
+        self.player.update_shot_deadline(self.telemetry.shot_deadline)
 
-        board_area = BoardArea(SingleOffenceGameSimulator.SIZE_X, SingleOffenceGameSimulator.SIZE_Y)
+        board_area = None
+        if self.render_mode == SingleOffenceGameSimulator.RENDER_MODE_INLINE:
+            board_area = BoardArea(SingleOffenceGameSimulator.SIZE_X, SingleOffenceGameSimulator.SIZE_Y)
 
         shot_num = 1
         shot = None
         left_click = None
+        dirty = True  # The screen has to be redrawn
         # self.message_area.append_text(f"Turn {shot_num}")
         while not self.player_game_status.game_over:
-            # poll for events
-            # pygame.QUIT event means the user clicked X to close your window
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    raise QuitGameException()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:
-                        left_click = event.pos
+            if self.render_mode == SingleOffenceGameSimulator.RENDER_MODE_INLINE:
+                if isinstance(self.player, HumanPlayer) and not dirty:
+                    # Nothing changes while the player thinks, so sleep until there is input
+                    events = [pygame.event.wait(SingleOffenceGameSimulator.INPUT_TIMEOUT_MS)] + pygame.event.get()
+                else:
+                    events = pygame.event.get()
+                # poll for events
+                # pygame.QUIT event means the user clicked X to close your window
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        raise QuitGameException()
+                    elif event.type == pygame.MOUSEBUTTONDOWN:
+                        if event.button == 1:
+                            left_click = event.pos
+                    elif event.type == pygame.WINDOWEXPOSED:
+                        dirty = True
 
             if left_click is not None:
                 shot = board_area.convert_pos_to_board_coord((100, 100), left_click)
@@ -330,69 +489,139 @@ class SingleOffenceGameSimulator:
                 left_click = None
 
             if not isinstance(self.player, HumanPlayer):
-                shot = self.player.shoot()
+                shoot_start = time.perf_counter()
+                shot = self.telemetry.timed_shoot(self.player)
                 # self.message_area.append_text(f"You called '{shot}'")
+                if self.metrics is not None:
+                    self.metrics.record_phase('shoot', time.perf_counter() - shoot_start)
 
             if shot is not None:
+                resolve_start = time.perf_counter()
                 try:
                     shot_result, ship_sunk, sunken_ship_type = self.npc_game_status.add_defence_shot(shot)
-                    self.player_game_status.add_offence_shot(shot, shot_result, ship_sunk, sunken_ship_type)
+                    shot_idx = self.player_game_status.add_offence_shot(shot, shot_result, ship_sunk, sunken_ship_type)
+                    self.player.on_shot_result(shot_idx, shot_result, sunken_ship_type)
 
+                    if self.metrics is not None:
+                        self.metrics.record_shots(1)
                     if self.player_game_status.game_over:
-                        self.message_area.append_text(f"Game {self.game_num}: You win in {shot_num} turns!")
+                        self.append_message(f"Game {self.game_num}: You win in {shot_num} turns!")
                         self.win_statistics[shot_num - 1] += 1
+                        if self.metrics is not None:
+                            self.metrics.record_game(shot_num)
                     else:
                         shot_num += 1
                         # self.message_area.append_text(f"Turn {shot_num}")
                 except InvalidShotException as e:
                     logger.warning(e)
-                    self.message_area.append_text(str(e))
+                    self.append_message(str(e))
                 shot = None
+                dirty = True
+                if self.metrics is not None:
+                    self.metrics.record_phase('resolve', time.perf_counter() - resolve_start)
 
-            # Draw screen
-            self.main_surface.fill("black")
+            if self.render_mode != SingleOffenceGameSimulator.RENDER_MODE_INLINE:
+                render_start = time.perf_counter()
+                self.push_frame(final=self.player_game_status.game_over)
+                if self.metrics is not None:
+                    self.metrics.record_phase('render', time.perf_counter() - render_start)
+                continue
 
-            board_area.update(self.player_game_status)
-            self.main_surface.blit(board_area.surface, (100, 100))
+            if not dirty:
+                continue
 
-            self.statistics_area.update(self.win_statistics)
-            self.main_surface.blit(self.statistics_area.surface, (780, 100))
-
-            self.message_area.update()
-            self.main_surface.blit(self.message_area.surface, (100, 780))
+            # Draw screen
+            render_start = time.perf_counter()
+            SingleOffenceGameSimulator.draw_screen(
+                self.main_surface, board_area, self.player_game_status,
+                self.statistics_area, self.win_statistics, self.message_area
+            )
 
             pygame.display.flip()
+            dirty = False
+            if self.metrics is not None:
+                self.metrics.record_phase('render', time.perf_counter() - render_start)
 
             if self.tps is not None:
-                ms = self.clock.tick_busy_loop(self.tps)
+                # Sleeps instead of spinning until the next tick
+                ms = self.clock.tick(self.tps)
+
+    def run_games(self):
+        for n in range(self.num_simulation):
+            self.game_num += 1
+            # self.message_area.append_text(f"Game {self.game_num}")
+            self.run_simulation()
+            if isinstance(self.player, HumanPlayer):
+                SingleOffenceGameSimulator.wait_for_press_any_key()
+
+        logger.info(self.win_statistics)
+        logger.info(self.telemetry.export())
+        if self.telemetry_path is not None:
+            self.telemetry.export_csv(self.telemetry_path)
+
+    def run_games_in_background(self):
+        try:
+            self.run_games()
+        except Exception as e:
+            self.simulation_error = e
+        finally:
+            # The worker drains the queue before it stops
+            if not self.render_worker.quit:
+                try:
+                    self.put_render_event((RenderWorker.EVENT_STOP,))
+                except QuitGameException:
+                    pass
 
     def start(self):
+        if self.render_mode == SingleOffenceGameSimulator.RENDER_MODE_OFFSCREEN:
+            # No window at all, e.g. on CI
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
         pygame.init()
 
+        if self.metrics_port is not None:
+            self.metrics = SimulationMetrics()
+            self.metrics_server = MetricsServer(self.metrics, port=self.metrics_port)
+            self.metrics_server.start()
+
         logger.info('SingleOffenceGameSimulator starts.')
         logger.info(f"{self.player.__class__.__name__}")
         logger.info(f"{self.num_simulation} Games")
 
-        self.main_surface = pygame.display.set_mode(SingleOffenceGameSimulator.SCREEN_SIZE)
-        self.clock = pygame.time.Clock()
-
-        self.statistics_area = StatisticsArea()
-        self.message_area = MessageArea()
-
-        if self.seed is not None:
-            random.seed(self.seed)
+        if self.render_mode == SingleOffenceGameSimulator.RENDER_MODE_INLINE:
+            self.main_surface = pygame.display.set_mode(SingleOffenceGameSimulator.SCREEN_SIZE)
+            self.clock = pygame.time.Clock()
+
+            self.statistics_area = StatisticsArea()
+            self.message_area = MessageArea()
+        else:
+            self.render_worker = RenderWorker(
+                self.render_events,
+                offscreen=self.render_mode == SingleOffenceGameSimulator.RENDER_MODE_OFFSCREEN,
+                frame_dir=self.frame_dir,
+                fps=self.tps,
+            )
 
-        SingleOffenceGameSimulator.wait_for_press_any_key()
+        if self.seed is None:
+            self.seed = make_run_seed()
+        logger.info(f"Seed {self.seed}")
 
-        for n in range(self.num_simulation):
-            self.game_num += 1
-            # self.message_area.append_text(f"Game {self.game_num}")
-            self.run_simulation()
-            if isinstance(self.player, HumanPlayer):
-                SingleOffenceGameSimulator.wait_for_press_any_key()
-
-        logger.info(self.win_statistics)
-        if not isinstance(self.player, HumanPlayer):
+        if self.render_mode == SingleOffenceGameSimulator.RENDER_MODE_INLINE:
             SingleOffenceGameSimulator.wait_for_press_any_key()
+            self.run_games()
+            if not isinstance(self.player, HumanPlayer):
+                SingleOffenceGameSimulator.wait_for_press_any_key()
+        else:
+            # The window stays on the main thread, the games run in the background
+            simulation = threading.Thread(target=self.run_games_in_background, daemon=True)
+            simulation.start()
+            self.render_worker.run()
+            simulation.join()
+            logger.info(f"{self.render_worker.num_frames} frames rendered, {self.dropped_frames} dropped")
+            if self.simulation_error is not None:
+                raise self.simulation_error
+            if self.render_mode == SingleOffenceGameSimulator.RENDER_MODE_THREAD:
+                SingleOffenceGameSimulator.wait_for_press_any_key()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
 
         logger.info('SingleOffenceGameSimulator ends.')
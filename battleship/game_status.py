@@ -21,44 +21,61 @@ class GameStatus:
         MARKER_CARRIER: 5,
     }
 
-    def __init__(self, size_x, size_y):
+    def __init__(self, size_x, size_y, ships_and_sizes=None):
         self.size_x = size_x
         self.size_y = size_y
+        if ships_and_sizes is None:
+            ships_and_sizes = GameStatus.SHIPS_AND_SIZES
+        self.ships_and_sizes = ships_and_sizes
         self.offence_turn = 1
         self.defence_board = [GameStatus.MARKER_EMPTY] * (self.size_x * self.size_y)
         self.offence_board = [GameStatus.MARKER_EMPTY] * (self.size_x * self.size_y)
         self.defence_shot_log = []
         self.offence_shot_log = []
         self.offence_enemy_sink_log = []
-        self.defence_ships_hp = {
-            GameStatus.MARKER_PATROL_BOAT: 2,
-            GameStatus.MARKER_SUBMARINE: 3,
-            GameStatus.MARKER_DESTROYER: 3,
-            GameStatus.MARKER_BATTLESHIP: 4,
-            GameStatus.MARKER_CARRIER: 5,
-        }
-        self.offence_ships_alive = [
-            GameStatus.MARKER_PATROL_BOAT,
-            GameStatus.MARKER_SUBMARINE,
-            GameStatus.MARKER_DESTROYER,
-            GameStatus.MARKER_BATTLESHIP,
-            GameStatus.MARKER_CARRIER,
-        ]
-        self.defence_hp_sum = 17
-        self.offence_hp_sum = 17
+        self.defence_ships_hp = dict(self.ships_and_sizes)
+        self.offence_ships_alive = list(self.ships_and_sizes)
+        self.defence_hp_sum = sum(self.ships_and_sizes.values())
+        self.offence_hp_sum = sum(self.ships_and_sizes.values())
         self.game_over = False
         self.defence_win = False
         self.offence_win = False
+        self.offence_shared = False
+        self.defence_shared = False
+
+    def fork(self):
+        # A child shares every container with its parent until either of them writes to it,
+        # which keeps speculative states for lookahead cheap
+        self.offence_shared = True
+        self.defence_shared = True
+        child = GameStatus.__new__(GameStatus)
+        child.__dict__.update(self.__dict__)
+        return child
+
+    def __own_offence_state__(self):
+        if self.offence_shared:
+            self.offence_board = list(self.offence_board)
+            self.offence_shot_log = list(self.offence_shot_log)
+            self.offence_enemy_sink_log = list(self.offence_enemy_sink_log)
+            self.offence_ships_alive = list(self.offence_ships_alive)
+            self.offence_shared = False
+
+    def __own_defence_state__(self):
+        if self.defence_shared:
+            self.defence_board = list(self.defence_board)
+            self.defence_shot_log = list(self.defence_shot_log)
+            self.defence_ships_hp = dict(self.defence_ships_hp)
+            self.defence_shared = False
 
     def print_offence_board(self):
-        print('  1 2 3 4 5 6 7 8 9 10')
-        for x in range(10):
-            print(chr(x + ord('A')) + ' ' + ' '.join(self.offence_board[x * self.size_x:(x + 1) * self.size_x]))
+        print('  ' + ' '.join(str(y + 1) for y in range(self.size_y)))
+        for x in range(self.size_x):
+            print(chr(x + ord('A')) + ' ' + ' '.join(self.offence_board[x * self.size_y:(x + 1) * self.size_y]))
 
     def print_defence_board(self):
-        print('  1 2 3 4 5 6 7 8 9 10')
-        for x in range(10):
-            print(chr(x + ord('A')) + ' ' + ' '.join(self.defence_board[x * self.size_x:(x + 1) * self.size_x]))
+        print('  ' + ' '.join(str(y + 1) for y in range(self.size_y)))
+        for x in range(self.size_x):
+            print(chr(x + ord('A')) + ' ' + ' '.join(self.defence_board[x * self.size_y:(x + 1) * self.size_y]))
 
     def print_all_board(self):
         pass
@@ -66,6 +83,7 @@ class GameStatus:
     def set_defence_board(self, board):
         if not self.__verify_board__(board):
             raise InvalidShipPlacementException()
+        # The board is replaced, not written to, so a fork keeps the one it shares
         self.defence_board = board
 
     def add_offence_shot(self, shot, result, ship_sunk, sunken_ship_type):
@@ -76,6 +94,7 @@ class GameStatus:
         assert self.offence_board[shot_idx] != GameStatus.MARKER_MISS \
                and self.offence_board[shot_idx] != GameStatus.MARKER_HIT
 
+        self.__own_offence_state__()
         self.offence_shot_log.append(shot)
         self.offence_board[shot_idx] = result
 
@@ -91,6 +110,7 @@ class GameStatus:
                 self.game_over = True
 
         self.offence_turn += 1
+        return shot_idx
 
     def add_defence_shot(self, shot):
         shot_x, shot_y = self.__shot_to_xy__(shot)
@@ -101,6 +121,7 @@ class GameStatus:
             raise InvalidShotException(f"You have already called '{shot}'!")
 
         # Valid shot
+        self.__own_defence_state__()
         self.defence_shot_log.append(shot)
 
         if self.defence_board[shot_idx] == GameStatus.MARKER_EMPTY:
@@ -152,8 +173,43 @@ class GameStatus:
         return shots
 
     def __verify_board__(self, board):
-        # TODO implement
-        return True
+        # Shots are written into the board, so it has to be a list of markers
+        if not isinstance(board, list) or len(board) != self.size_x * self.size_y:
+            return False
+        # One marker per cell, joined markers would hide a missing or merged cell
+        if not all(isinstance(marker, str) and len(marker) == 1 for marker in board):
+            return False
+        board = ''.join(board)
+        return GameStatus.verify_boards([board], self.size_x, self.size_y, self.ships_and_sizes)[0]
+
+    @staticmethod
+    def verify_boards(boards, size_x, size_y, ships_and_sizes=None):
+        # Boards are strings of markers, one per cell, as stored in a board corpus.
+        # Every check is a str method running in C, which keeps bulk validation fast.
+        if ships_and_sizes is None:
+            ships_and_sizes = GameStatus.SHIPS_AND_SIZES
+        board_size = size_x * size_y
+        ships = [(ship, size, ship * size, size * size_y) for ship, size in ships_and_sizes.items()]
+        num_empty = board_size - sum(ships_and_sizes.values())
+
+        results = []
+        for board in boards:
+            valid = len(board) == board_size and board.count(GameStatus.MARKER_EMPTY) == num_empty
+            if valid:
+                # With the empty cells counted, a straight run of `size` cells from the first cell of
+                # every ship leaves no room for stray markers, extra cells or overlaps
+                for ship, size, ship_cells, vertical_span in ships:
+                    idx = board.find(ship)
+                    if idx < 0:
+                        valid = False
+                        break
+                    if board[idx:idx + size] == ship_cells and idx % size_y + size <= size_y:
+                        continue
+                    if board[idx:idx + vertical_span:size_y] != ship_cells:
+                        valid = False
+                        break
+            results.append(valid)
+        return results
 
     def __xy_to_idx__(self, x, y):
         if x >= self.size_x or y >= self.size_y:
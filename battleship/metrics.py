@@ -0,0 +1,149 @@
+import collections
+import http.server
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationMetrics:
+    # Counters shared by a running simulation and MetricsServer, rendered in the Prometheus text format
+    RATE_WINDOW = 60  # Seconds the per second rates are averaged over
+    TURNS_BUCKETS = list(range(5, 101, 5))
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.games_completed = 0
+        self.shots = 0
+        self.win_statistics = [0] * 100
+        self.phase_seconds = {}
+        self.phase_counts = {}
+        # (time, games, shots) about once a second, on records and scrapes. The first one is the newest
+        # that is at least RATE_WINDOW old, so that a stall drops the rates to 0 within the window.
+        self.samples = collections.deque([(self.start_time, 0, 0)])
+
+    def __sample__(self):
+        now = time.monotonic()
+        sample = (now, self.games_completed, self.shots)
+        # One sample per second since the start, the newest one stays current within its second
+        if len(self.samples) > 1 and int(now - self.start_time) == int(self.samples[-1][0] - self.start_time):
+            self.samples[-1] = sample
+        else:
+            self.samples.append(sample)
+        while len(self.samples) > 1 and now - self.samples[1][0] >= SimulationMetrics.RATE_WINDOW:
+            self.samples.popleft()
+        return now
+
+    def record_shots(self, num_shots):
+        with self.lock:
+            self.shots += num_shots
+            self.__sample__()
+
+    def record_game(self, turns):
+        with self.lock:
+            self.games_completed += 1
+            self.win_statistics[turns - 1] += 1
+            self.__sample__()
+
+    def record_win_statistics(self, win_statistics):
+        # Games finished elsewhere, e.g. by a distributed worker. Every turn of a game is one shot.
+        with self.lock:
+            for turns, count in enumerate(win_statistics):
+                self.win_statistics[turns] += count
+                self.games_completed += count
+                self.shots += (turns + 1) * count
+            self.__sample__()
+
+    def record_phase(self, phase, seconds):
+        with self.lock:
+            self.phase_seconds[phase] = self.phase_seconds.get(phase, 0) + seconds
+            self.phase_counts[phase] = self.phase_counts.get(phase, 0) + 1
+
+    def render(self):
+        with self.lock:
+            now = self.__sample__()
+            sample_time, sample_games, sample_shots = self.samples[0]
+            window = now - sample_time
+            games_per_second = (self.games_completed - sample_games) / window if window > 0 else 0
+            shots_per_second = (self.shots - sample_shots) / window if window > 0 else 0
+
+            lines = [
+                '# HELP battleship_games_completed_total Games played to the end.',
+                '# TYPE battleship_games_completed_total counter',
+                f'battleship_games_completed_total {self.games_completed}',
+                '# HELP battleship_shots_total Shots fired.',
+                '# TYPE battleship_shots_total counter',
+                f'battleship_shots_total {self.shots}',
+                f'# HELP battleship_games_per_second Games completed per second, '
+                f'over the last {SimulationMetrics.RATE_WINDOW} seconds.',
+                '# TYPE battleship_games_per_second gauge',
+                f'battleship_games_per_second {games_per_second:.3f}',
+                f'# HELP battleship_shots_per_second Shots per second, '
+                f'over the last {SimulationMetrics.RATE_WINDOW} seconds.',
+                '# TYPE battleship_shots_per_second gauge',
+                f'battleship_shots_per_second {shots_per_second:.3f}',
+                '# HELP battleship_uptime_seconds Seconds since the simulation started.',
+                '# TYPE battleship_uptime_seconds gauge',
+                f'battleship_uptime_seconds {now - self.start_time:.3f}',
+                '# HELP battleship_turns_to_win Turns the offence needed to win.',
+                '# TYPE battleship_turns_to_win histogram',
+            ]
+            for bucket in SimulationMetrics.TURNS_BUCKETS:
+                lines.append(f'battleship_turns_to_win_bucket{{le="{bucket}"}} {sum(self.win_statistics[:bucket])}')
+            lines.append(f'battleship_turns_to_win_bucket{{le="+Inf"}} {sum(self.win_statistics)}')
+            turns_sum = sum((turns + 1) * count for turns, count in enumerate(self.win_statistics))
+            lines.append(f'battleship_turns_to_win_sum {turns_sum}')
+            lines.append(f'battleship_turns_to_win_count {sum(self.win_statistics)}')
+
+            lines.append('# HELP battleship_phase_seconds_total Seconds spent per phase of the simulation loop.')
+            lines.append('# TYPE battleship_phase_seconds_total counter')
+            for phase, seconds in sorted(self.phase_seconds.items()):
+                lines.append(f'battleship_phase_seconds_total{{phase="{phase}"}} {seconds:.6f}')
+            lines.append('# HELP battleship_phase_count_total Times each phase ran.')
+            lines.append('# TYPE battleship_phase_count_total counter')
+            for phase, count in sorted(self.phase_counts.items()):
+                lines.append(f'battleship_phase_count_total{{phase="{phase}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ['/', '/metrics']:
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes would flood the simulation log
+        pass
+
+
+class MetricsServer:
+    PORT = 9750
+
+    def __init__(self, metrics, host='localhost', port=PORT):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.server = None
+
+    def start(self):
+        self.server = http.server.ThreadingHTTPServer((self.host, self.port), MetricsRequestHandler)
+        self.server.daemon_threads = True
+        self.server.metrics = self.metrics
+        self.port = self.server.server_address[1]  # Port 0 picks a free one
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logger.info(f"Metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
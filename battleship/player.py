@@ -1,8 +1,8 @@
 import logging
 import abc
+import collections
 import random
 from .game_status import GameStatus
-from .exception import InvalidShotException
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +12,8 @@ class Player:
         self.name = None
         self.game_status = GameStatus(10, 10)  # default
         self.console_io = console_io
+        self.shot_deadline = None  # seconds per shot, None means unlimited
+        self.rng = random.Random()  # Games hand every player its own stream through update_rng()
 
     @abc.abstractmethod
     def shoot(self):
@@ -21,40 +23,45 @@ class Player:
     def reset(self):
         pass
 
+    @classmethod
+    def shoot_batch(cls, players):
+        # One player per concurrent game. Players that can share work across games override this.
+        return [player.shoot() for player in players]
+
     def place_ships(self):
         board = [GameStatus.MARKER_EMPTY] * (self.game_status.size_x * self.game_status.size_y)
 
-        for ship in GameStatus.SHIPS_AND_SIZES:
+        for ship in self.game_status.ships_and_sizes:
             ship_placed = False
             while not ship_placed:
-                direction = random.randint(0, 1)
+                direction = self.rng.randint(0, 1)
                 if direction == 0:
                     # Horizontal (same pos_x)
-                    pos_x = random.randint(0, self.game_status.size_x - 1)
-                    pos_y = random.randint(0, self.game_status.size_y - GameStatus.SHIPS_AND_SIZES[ship])
+                    pos_x = self.rng.randint(0, self.game_status.size_x - 1)
+                    pos_y = self.rng.randint(0, self.game_status.size_y - self.game_status.ships_and_sizes[ship])
 
                     can_be_placed = True
-                    for l in range(GameStatus.SHIPS_AND_SIZES[ship]):
+                    for l in range(self.game_status.ships_and_sizes[ship]):
                         if board[self.game_status.__xy_to_idx__(pos_x, pos_y + l)] != GameStatus.MARKER_EMPTY:
                             can_be_placed = False
                             break
                     if can_be_placed:
-                        for l in range(GameStatus.SHIPS_AND_SIZES[ship]):
+                        for l in range(self.game_status.ships_and_sizes[ship]):
                             board[self.game_status.__xy_to_idx__(pos_x, pos_y + l)] = ship
                         ship_placed = True
 
                 else:  # direction = 1
                     # Vertical (same pos_y)
-                    pos_x = random.randint(0, self.game_status.size_x - GameStatus.SHIPS_AND_SIZES[ship])
-                    pos_y = random.randint(0, self.game_status.size_y - 1)
+                    pos_x = self.rng.randint(0, self.game_status.size_x - self.game_status.ships_and_sizes[ship])
+                    pos_y = self.rng.randint(0, self.game_status.size_y - 1)
 
                     can_be_placed = True
-                    for l in range(GameStatus.SHIPS_AND_SIZES[ship]):
+                    for l in range(self.game_status.ships_and_sizes[ship]):
                         if board[self.game_status.__xy_to_idx__(pos_x + l, pos_y)] != GameStatus.MARKER_EMPTY:
                             can_be_placed = False
                             break
                     if can_be_placed:
-                        for l in range(GameStatus.SHIPS_AND_SIZES[ship]):
+                        for l in range(self.game_status.ships_and_sizes[ship]):
                             board[self.game_status.__xy_to_idx__(pos_x + l, pos_y)] = ship
                         ship_placed = True
 
@@ -63,6 +70,20 @@ class Player:
     def update_game_status(self, game_status: GameStatus):
         self.game_status = game_status
 
+    def update_rng(self, rng):
+        self.rng = rng
+
+    def update_shot_deadline(self, shot_deadline):
+        self.shot_deadline = shot_deadline
+
+    def on_shot_result(self, index, result, sunk_ship):
+        # Pushed by the game after every offence shot, sunk_ship is None unless the shot sank a ship
+        pass
+
+    def forfeit_shot(self, late_shot, replacement_shot):
+        # Called when the game replaced a shot that missed the deadline
+        pass
+
 
 class HumanPlayer(Player):
     def __init__(self, console_io=False):
@@ -90,9 +111,16 @@ class SequentialPlayer(Player):
 
     def reset(self):
         self.shot_candidates = []
-        for x in range(10):
-            for y in range(10):
-                self.shot_candidates.append(f"{chr(x + ord('A'))}{y + 1}")
+        for x in range(self.game_status.size_x):
+            for y in range(self.game_status.size_y):
+                self.shot_candidates.append(self.game_status.__xy_to_shot__(x, y))
+
+    def forfeit_shot(self, late_shot, replacement_shot):
+        # The late shot was never fired, so it is still a candidate
+        if late_shot not in self.shot_candidates:
+            self.shot_candidates.insert(0, late_shot)
+        if replacement_shot in self.shot_candidates:
+            self.shot_candidates.remove(replacement_shot)
 
 
 class RandomPlayer(SequentialPlayer):
@@ -101,196 +129,314 @@ class RandomPlayer(SequentialPlayer):
 
     def reset(self):
         super().reset()
-        random.shuffle(self.shot_candidates)
+        self.rng.shuffle(self.shot_candidates)
 
 
 class HuntAndTargetPlayer(RandomPlayer):
-    def __init__(self, console_io=False):
+    def __init__(self, console_io=False, parity=False):
         self.targets = None
+        self.queued_targets = None  # The targets as a set, for membership tests
+        self.last_target = None  # The last shot, if it was taken from the targets
+        self.parity = parity  # Hunt on one colour of the checkerboard first
         super().__init__(console_io=console_io)
 
+    def on_shot_result(self, index, result, sunk_ship):
+        if result == GameStatus.MARKER_HIT:
+            shot = self.game_status.__idx_to_shot__(index)
+            for target in self.game_status.get_surrounding_shots(shot):
+                target_idx = self.game_status.__shot_to_idx__(target)
+                if self.game_status.offence_board[target_idx] == GameStatus.MARKER_EMPTY \
+                        and target not in self.queued_targets:
+                    self.targets.append(target)
+                    self.queued_targets.add(target)
+
+    def next_unfired(self, shots):
+        # Shots fired as targets stay in the candidates, they are skipped here instead of removed
+        while len(shots) > 0:
+            shot = shots.popleft()
+            self.queued_targets.discard(shot)
+            if self.game_status.offence_board[self.game_status.__shot_to_idx__(shot)] == GameStatus.MARKER_EMPTY:
+                return shot
+        return None
+
     def shoot(self):
-        last_shot, last_shot_result, last_sunken_ship = self.game_status.get_last_shot()
-        if last_shot_result == GameStatus.MARKER_HIT:
-            targets = self.game_status.get_surrounding_shots(last_shot)
-            for shot in targets:
-                if shot in self.shot_candidates and shot not in self.targets:
-                    self.targets.append(shot)
-
-        if len(self.targets) == 0:
-            shot = self.shot_candidates.pop(0)
-        else:
-            shot = self.targets.pop(0)
-            self.shot_candidates.remove(shot)
+        shot = self.next_unfired(self.targets)
+        self.last_target = shot
+        if shot is None:
+            shot = self.next_unfired(self.shot_candidates)
         if self.console_io:
             print(f'Turn {self.game_status.offence_turn}: Shoot at {shot}')
         return shot
 
     def reset(self):
         super().reset()
-        self.targets = []
+        self.targets = collections.deque()
+        self.queued_targets = set()
+        if self.parity:
+            # Every ship covers cells of both colours, so the other colour is left for the targets
+            self.shot_candidates.sort(key=lambda shot: sum(self.game_status.__shot_to_xy__(shot)) % 2)
+        self.shot_candidates = collections.deque(self.shot_candidates)
+        self.last_target = None
+
+    def forfeit_shot(self, late_shot, replacement_shot):
+        super().forfeit_shot(late_shot, replacement_shot)
+        # A late target was never fired, so it goes back to the front of the targets
+        if late_shot == self.last_target and late_shot not in self.queued_targets:
+            self.targets.appendleft(late_shot)
+            self.queued_targets.add(late_shot)
+        self.last_target = None
 
 
 class ProbabilityPlayer(SequentialPlayer):
-    def __init__(self, console_io=False):
-        self.sunken_ships_with_active_hits = []
-        self.active_hits_idx = []
+    # Placements of every ship size on every board size, as (bit mask, cell indices)
+    placement_cache = {}
+    # Placements containing each cell, as bit masks
+    cell_placement_cache = {}
+    TARGETING_BUDGET = 20000  # DFS nodes spent on enumerating hit covers per shot
+
+    TIE_BREAK_FIRST = 'first'  # Lowest index
+    TIE_BREAK_LAST = 'last'  # Highest index
+    TIE_BREAK_CENTER = 'center'  # Closest to the center of the board
+    TIE_BREAK_RANDOM = 'random'
+    TIE_BREAKS = [TIE_BREAK_FIRST, TIE_BREAK_LAST, TIE_BREAK_CENTER, TIE_BREAK_RANDOM]
+
+    def __init__(self, console_io=False, targeting_budget=TARGETING_BUDGET, tie_break=TIE_BREAK_FIRST, parity=False):
+        if tie_break not in ProbabilityPlayer.TIE_BREAKS:
+            raise ValueError(f"Unknown tie break, {tie_break}")
+        self.targeting_budget = targeting_budget
+        self.tie_break = tie_break
+        self.parity = parity  # Hunt on one colour of the checkerboard while it has any chance
         self.alive_ships = None
+        self.blocked = 0  # Bit mask of every cell shot at
+        self.hits = 0
+        self.misses = 0
+        self.sunken_ship_candidates = []  # Per sunken ship, the placements that agree with its sink
+        self.sunken_ship_combos = [0]  # Masks of every disjoint choice of sunken ship placements
         super().__init__(console_io=console_io)
 
-    def get_max_hunting_probability_shot(self):
-        prob = [0] * (self.game_status.size_x * self.game_status.size_y)
-        for ship in self.alive_ships:
-            ship_size = self.game_status.SHIPS_AND_SIZES[ship]
+    def get_placements(self, ship_size):
+        key = (self.game_status.size_x, self.game_status.size_y, ship_size)
+        if key not in ProbabilityPlayer.placement_cache:
+            placements = []
             for idx in range(self.game_status.size_x * self.game_status.size_y):
-                if self.game_status.offence_board[idx] != GameStatus.MARKER_EMPTY:
-                    continue
                 base_x, base_y = self.game_status.__idx_to_xy__(idx)
+                # Horizontal, then vertical placement
+                for delta_x, delta_y in [(0, 1), (1, 0)]:
+                    if base_x + delta_x * (ship_size - 1) >= self.game_status.size_x \
+                            or base_y + delta_y * (ship_size - 1) >= self.game_status.size_y:
+                        continue
+                    cells = [
+                        self.game_status.__xy_to_idx__(base_x + delta_x * delta, base_y + delta_y * delta)
+                        for delta in range(ship_size)
+                    ]
+                    mask = 0
+                    for cell in cells:
+                        mask |= 1 << cell
+                    placements.append((mask, cells))
+            ProbabilityPlayer.placement_cache[key] = placements
+        return ProbabilityPlayer.placement_cache[key]
+
+    def get_cell_placements(self, ship_size):
+        key = (self.game_status.size_x, self.game_status.size_y, ship_size)
+        if key not in ProbabilityPlayer.cell_placement_cache:
+            cell_placements = [[] for _ in range(self.game_status.size_x * self.game_status.size_y)]
+            for mask, cells in self.get_placements(ship_size):
+                for cell in cells:
+                    cell_placements[cell].append(mask)
+            ProbabilityPlayer.cell_placement_cache[key] = cell_placements
+        return ProbabilityPlayer.cell_placement_cache[key]
+
+    def select_max_probability_idx(self, prob, cells=None):
+        if cells is None:
+            cells = range(self.game_status.size_x * self.game_status.size_y)
+        max_prob = max(prob[idx] for idx in cells)
+        if max_prob == 0:
+            return None
+        ties = [idx for idx in cells if prob[idx] == max_prob]
+
+        if self.tie_break == ProbabilityPlayer.TIE_BREAK_LAST:
+            return ties[-1]
+        elif self.tie_break == ProbabilityPlayer.TIE_BREAK_CENTER:
+            center_x = (self.game_status.size_x - 1) / 2
+            center_y = (self.game_status.size_y - 1) / 2
+
+            def distance(idx):
+                x, y = self.game_status.__idx_to_xy__(idx)
+                return (x - center_x) ** 2 + (y - center_y) ** 2
+            return min(ties, key=distance)
+        elif self.tie_break == ProbabilityPlayer.TIE_BREAK_RANDOM:
+            return self.rng.choice(ties)
+        return ties[0]
+
+    def get_hunting_probabilities(self):
+        # Cells that were shot at block a placement, whatever the result was
+        blocked = self.blocked
 
-                # Test Horizontal Placement
-                horizontal_available = True
-                for delta in range(1, ship_size):
-                    try:
-                        test_idx = self.game_status.__xy_to_idx__(base_x, base_y + delta)
-                    except InvalidShotException:
-                        horizontal_available = False
-                        break
-
-                    if self.game_status.offence_board[test_idx] != GameStatus.MARKER_EMPTY:
-                        horizontal_available = False
-                        break
-
-                if horizontal_available:
-                    for delta in range(0, ship_size):
-                        prob_idx = self.game_status.__xy_to_idx__(base_x, base_y + delta)
-                        prob[prob_idx] += 1
-
-                # Test Vertical Placement
-                vertical_available = True
-                for delta in range(1, ship_size):
-                    try:
-                        test_idx = self.game_status.__xy_to_idx__(base_x + delta, base_y)
-                    except InvalidShotException:
-                        vertical_available = False
-                        break
-                    if self.game_status.offence_board[test_idx] != GameStatus.MARKER_EMPTY:
-                        vertical_available = False
-                        break
-
-                if vertical_available:
-                    for delta in range(0, ship_size):
-                        prob_idx = self.game_status.__xy_to_idx__(base_x + delta, base_y)
-                        prob[prob_idx] += 1
-        max_prob = 0
-        max_prob_idx = 0
-        for idx in range(self.game_status.size_x * self.game_status.size_y):
-            if prob[idx] > max_prob:
-                max_prob_idx = idx
-                max_prob = prob[idx]
-
-        return self.game_status.__idx_to_shot__(max_prob_idx)
-
-    def get_max_targeting_probability_shot(self):
         prob = [0] * (self.game_status.size_x * self.game_status.size_y)
         for ship in self.alive_ships:
-            ship_size = self.game_status.SHIPS_AND_SIZES[ship]
-            for idx in range(self.game_status.size_x * self.game_status.size_y):
-                base_x, base_y = self.game_status.__idx_to_xy__(idx)
+            for mask, cells in self.get_placements(self.game_status.ships_and_sizes[ship]):
+                if mask & blocked == 0:
+                    for cell in cells:
+                        prob[cell] += 1
+        return prob
+
+    def get_max_hunting_probability_shot(self, prob=None):
+        if prob is None:
+            prob = self.get_hunting_probabilities()
+        max_prob_idx = None
+        if self.parity:
+            parity_cells = [
+                idx for idx in range(self.game_status.size_x * self.game_status.size_y)
+                if sum(self.game_status.__idx_to_xy__(idx)) % 2 == 0
+            ]
+            max_prob_idx = self.select_max_probability_idx(prob, parity_cells)
+        if max_prob_idx is None:
+            max_prob_idx = self.select_max_probability_idx(prob)
+        if max_prob_idx is None:
+            # No placement left, which only an inconsistent board leads to
+            max_prob_idx = self.game_status.offence_board.index(GameStatus.MARKER_EMPTY)
 
-                # Test Horizontal Placement
-                horizontal_available = True
-                overlaps_with_active_hits = False
-                for delta in range(0, ship_size):
-                    try:
-                        test_idx = self.game_status.__xy_to_idx__(base_x, base_y + delta)
-                    except InvalidShotException:
-                        horizontal_available = False
-                        break
-
-                    marker = self.game_status.offence_board[test_idx]
-                    if marker == GameStatus.MARKER_MISS:
-                        horizontal_available = False
-                        break
-                    elif marker == GameStatus.MARKER_HIT:
-                        if test_idx in self.active_hits_idx:
-                            overlaps_with_active_hits = True
-                        else:
-                            horizontal_available = False
-                            break
+        return self.game_status.__idx_to_shot__(max_prob_idx)
 
-                if horizontal_available and overlaps_with_active_hits:
-                    for delta in range(0, ship_size):
-                        prob_idx = self.game_status.__xy_to_idx__(base_x, base_y + delta)
-                        if self.game_status.offence_board[prob_idx] == GameStatus.MARKER_EMPTY:
-                            prob[prob_idx] += 1
-
-                # Test Vertical Placement
-                vertical_available = True
-                overlaps_with_active_hits = False
-                for delta in range(0, ship_size):
-                    try:
-                        test_idx = self.game_status.__xy_to_idx__(base_x + delta, base_y)
-                    except InvalidShotException:
-                        vertical_available = False
-                        break
-
-                    marker = self.game_status.offence_board[test_idx]
-                    if marker == GameStatus.MARKER_MISS:
-                        vertical_available = False
-                        break
-                    elif marker == GameStatus.MARKER_HIT:
-                        if test_idx in self.active_hits_idx:
-                            overlaps_with_active_hits = True
-                        else:
-                            vertical_available = False
-                            break
+    def get_max_targeting_probability_shot(self):
+        # Every choice of sunken ship placements leaves some hits unexplained, which the alive ships have
+        # to cover. Cells are weighted by the number of covers they are part of, so a cell no consistent
+        # cover reaches is never shot. Returns None when every hit is explained and it is time to hunt.
+        unexplained = [self.hits & ~combo for combo in self.sunken_ship_combos]
+        if all(hits == 0 for hits in unexplained):
+            return None
 
-                if vertical_available and overlaps_with_active_hits:
-                    for delta in range(0, ship_size):
-                        prob_idx = self.game_status.__xy_to_idx__(base_x + delta, base_y)
-                        if self.game_status.offence_board[prob_idx] == GameStatus.MARKER_EMPTY:
-                            prob[prob_idx] += 1
-        max_prob = 0
-        max_prob_idx = 0
-        for idx in range(self.game_status.size_x * self.game_status.size_y):
-            if prob[idx] > max_prob:
-                max_prob_idx = idx
-                max_prob = prob[idx]
+        prob = [0] * (self.game_status.size_x * self.game_status.size_y)
+        budget = [self.targeting_budget]
+        num_covers = 0
+        for combo, hits in zip(self.sunken_ship_combos, unexplained):
+            if hits != 0:
+                num_covers += self.__count_covers__(hits, self.misses | combo, list(self.alive_ships), 0, prob, budget)
+        if num_covers == 0:
+            if any(hits == 0 for hits in unexplained):
+                # Only the choices that explain every hit are consistent
+                return None
+            # Out of budget before a single cover was found
+            self.__add_overlap_counts__(unexplained, prob)
+
+        max_prob_idx = self.select_max_probability_idx(prob)
+        if max_prob_idx is None:
+            return None
 
         return self.game_status.__idx_to_shot__(max_prob_idx)
 
-    def shoot(self):
-        last_shot, last_shot_result, last_sunken_ship = self.game_status.get_last_shot()
-        if last_shot_result == GameStatus.MARKER_HIT:
-            self.active_hits_idx.append(self.game_status.__shot_to_idx__(last_shot))
-            if last_sunken_ship is not None:
-                self.alive_ships.remove(last_sunken_ship)
-                self.sunken_ships_with_active_hits.append(last_sunken_ship)
-                sum_length_sunken_ships = 0
-                for ship in self.sunken_ships_with_active_hits:
-                    sum_length_sunken_ships += GameStatus.SHIPS_AND_SIZES[ship]
-                if sum_length_sunken_ships == len(self.active_hits_idx):
-                    self.active_hits_idx = []
-                    self.sunken_ships_with_active_hits = []
-
-        if len(self.active_hits_idx) == 0:
-            shot = self.get_max_hunting_probability_shot()
-            self.shot_candidates.remove(shot)
+    def __count_covers__(self, hits, blocked, ships, covered, prob, budget):
+        if hits == 0:
+            empty = covered & ~self.hits
+            while empty:
+                low_bit = empty & -empty
+                prob[low_bit.bit_length() - 1] += 1
+                empty ^= low_bit
+            return 1
+        if budget[0] <= 0:
+            return 0
+        budget[0] -= 1
+
+        # The lowest unexplained hit has to belong to one of the alive ships
+        hit = (hits & -hits).bit_length() - 1
+        num_covers = 0
+        tried_sizes = set()
+        for num, ship in enumerate(ships):
+            ship_size = self.game_status.ships_and_sizes[ship]
+            # Ships of the same size are interchangeable, one of them is enough
+            if ship_size in tried_sizes:
+                continue
+            tried_sizes.add(ship_size)
+            rest = ships[:num] + ships[num + 1:]
+            for mask in self.get_cell_placements(ship_size)[hit]:
+                # An alive ship can not be all hits, it would have been sunk
+                if mask & blocked == 0 and mask & ~self.hits != 0:
+                    num_covers += self.__count_covers__(
+                        hits & ~mask, blocked | mask, rest, covered | mask, prob, budget
+                    )
+        return num_covers
+
+    def __add_overlap_counts__(self, unexplained, prob):
+        hits = unexplained[0]
+        blocked = self.misses | (self.hits & ~hits)
+        for ship in self.alive_ships:
+            for mask, cells in self.get_placements(self.game_status.ships_and_sizes[ship]):
+                if mask & blocked == 0 and mask & hits != 0:
+                    for cell in cells:
+                        if self.hits >> cell & 1 == 0:
+                            prob[cell] += 1
+
+    def __update_sunken_ship_combos__(self):
+        # Constraint propagation: a sunken ship left with a single placement rules that placement out
+        # for the others, until nothing changes
+        changed = True
+        while changed:
+            changed = False
+            for num, candidates in enumerate(self.sunken_ship_candidates):
+                if len(candidates) != 1:
+                    continue
+                for other_num, other_candidates in enumerate(self.sunken_ship_candidates):
+                    if other_num == num:
+                        continue
+                    remaining = [mask for mask in other_candidates if mask & candidates[0] == 0]
+                    if len(remaining) < len(other_candidates):
+                        self.sunken_ship_candidates[other_num] = remaining
+                        changed = True
+
+        combos = {0}
+        for candidates in self.sunken_ship_candidates:
+            combos = {combo | mask for combo in combos for mask in candidates if combo & mask == 0}
+        self.sunken_ship_combos = sorted(combos)
+
+    def on_shot_result(self, index, result, sunk_ship):
+        self.blocked |= 1 << index
+        if result == GameStatus.MARKER_HIT:
+            self.hits |= 1 << index
+            if sunk_ship is not None:
+                self.alive_ships.remove(sunk_ship)
+                # The sinking shot is part of the ship, and every other cell of it was hit before
+                candidates = [
+                    mask for mask in self.get_cell_placements(self.game_status.ships_and_sizes[sunk_ship])[index]
+                    if mask & ~self.hits == 0
+                ]
+                self.sunken_ship_candidates.append(candidates)
+                self.__update_sunken_ship_combos__()
         else:
-            shot = self.get_max_targeting_probability_shot()
-            self.shot_candidates.remove(shot)
+            self.misses |= 1 << index
+
+    def take_shot(self, shot):
         if self.console_io:
             print(f'Turn {self.game_status.offence_turn}: Shoot at {shot}')
         return shot
 
+    def shoot(self):
+        shot = self.get_max_targeting_probability_shot()
+        if shot is None:
+            shot = self.get_max_hunting_probability_shot()
+        return self.take_shot(shot)
+
+    @classmethod
+    def shoot_batch(cls, players):
+        # Games that shot at the same cells with the same ships alive share one hunting heatmap,
+        # which is common in the early turns of games played in lockstep. Ties are still broken per game.
+        shots = [None] * len(players)
+        hunting_games = {}
+        for num, player in enumerate(players):
+            shots[num] = player.get_max_targeting_probability_shot()
+            if shots[num] is None:
+                key = (player.blocked, tuple(player.alive_ships))
+                hunting_games.setdefault(key, []).append(num)
+        for nums in hunting_games.values():
+            prob = players[nums[0]].get_hunting_probabilities()
+            for num in nums:
+                shots[num] = players[num].get_max_hunting_probability_shot(prob)
+        return [player.take_shot(shot) for player, shot in zip(players, shots)]
+
     def reset(self):
         super().reset()
-        self.active_hits_idx = []
-        self.sunken_ships_with_active_hits = []
-        self.alive_ships = [
-            GameStatus.MARKER_PATROL_BOAT,
-            GameStatus.MARKER_SUBMARINE,
-            GameStatus.MARKER_DESTROYER,
-            GameStatus.MARKER_BATTLESHIP,
-            GameStatus.MARKER_CARRIER,
-        ]
+        self.alive_ships = list(self.game_status.ships_and_sizes)
+        self.blocked = 0
+        self.hits = 0
+        self.misses = 0
+        self.sunken_ship_candidates = []
+        self.sunken_ship_combos = [0]
@@ -0,0 +1,16 @@
+import random
+
+# Every game draws from its own streams, one per role, derived from (run seed, game number, role).
+# A game can then be replayed on its own, whichever games ran before it or next to it.
+ROLE_OFFENCE = 'offence'
+ROLE_DEFENCE = 'defence'
+
+
+def make_run_seed():
+    return random.SystemRandom().randrange(2 ** 63)
+
+
+def game_rng(seed, game_num, role):
+    # random.Random hashes string seeds with SHA-512, so neighbouring games get unrelated streams,
+    # the same in every process and on every host
+    return random.Random(f"{seed}:{game_num}:{role}")
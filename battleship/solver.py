@@ -0,0 +1,282 @@
+import logging
+import time
+from .game_status import GameStatus
+from .rng import ROLE_OFFENCE, game_rng
+from .symmetry import BoardSymmetry
+
+logger = logging.getLogger(__name__)
+
+
+class OptimalStrategySolver:
+    SIZE_X = 5
+    SIZE_Y = 5
+    # Larger fleets are supported, but 5x5 with two ships is already out of reach in pure Python
+    SHIPS_AND_SIZES = {
+        GameStatus.MARKER_PATROL_BOAT: 2,
+    }
+
+    def __init__(self, size_x=SIZE_X, size_y=SIZE_Y, ships_and_sizes=None):
+        if ships_and_sizes is None:
+            ships_and_sizes = OptimalStrategySolver.SHIPS_AND_SIZES
+        self.game_status = GameStatus(size_x, size_y, ships_and_sizes)
+        self.ships = list(ships_and_sizes)
+        self.ship_sizes = [ships_and_sizes[ship] for ship in self.ships]
+        self.total_size = sum(ships_and_sizes.values())
+        self.num_cells = size_x * size_y
+
+        # Every layout is a tuple of per-ship bit masks, in self.ships order
+        self.layouts = []
+        self.__enumerate_layouts__()
+
+        self.symmetry = BoardSymmetry(size_x, size_y)
+        self.mask_bytes = (self.num_cells + 7) // 8
+
+        self.cache = {}
+        self.lower_bounds = {}
+        self.layout_images = {}
+        self.nodes = 0
+        self.cache_hits = 0
+        self.pruned = 0
+        self.wall_time = 0
+
+    def __placements__(self, ship_size):
+        placements = []
+        for x in range(self.game_status.size_x):
+            for y in range(self.game_status.size_y):
+                # Horizontal (same x)
+                if y + ship_size <= self.game_status.size_y:
+                    mask = 0
+                    for delta in range(ship_size):
+                        mask |= 1 << self.game_status.__xy_to_idx__(x, y + delta)
+                    placements.append(mask)
+                # Vertical (same y)
+                if ship_size > 1 and x + ship_size <= self.game_status.size_x:
+                    mask = 0
+                    for delta in range(ship_size):
+                        mask |= 1 << self.game_status.__xy_to_idx__(x + delta, y)
+                    placements.append(mask)
+        return placements
+
+    def __enumerate_layouts__(self):
+        placements = [self.__placements__(self.game_status.ships_and_sizes[ship]) for ship in self.ships]
+
+        def place(ship_num, occupied, ship_masks):
+            if ship_num == len(self.ships):
+                self.layouts.append(tuple(ship_masks))
+                return
+            for mask in placements[ship_num]:
+                if mask & occupied == 0:
+                    ship_masks.append(mask)
+                    place(ship_num + 1, occupied | mask, ship_masks)
+                    ship_masks.pop()
+
+        place(0, 0, [])
+
+    def __layout_images__(self, layout):
+        # The same reduced layouts show up in many states, so their packed symmetric images are memoized
+        images = self.layout_images.get(layout)
+        if images is None:
+            images = [
+                b''.join(self.symmetry.transform_mask(mask, transform).to_bytes(self.mask_bytes, 'little')
+                         for mask in layout)
+                for transform in range(self.symmetry.num_transforms())
+            ]
+            self.layout_images[layout] = images
+        return images
+
+    def __canonical_key__(self, state, hit_counts):
+        # The hit counts of every symmetric image are cheap to compare and usually single out one image,
+        # so the full packed key is only built for the images that tie on them
+        images = None
+        best_counts = None
+        for transform, inverse_perm in enumerate(self.symmetry.inverse_perms):
+            counts = [hit_counts[idx] for idx in inverse_perm]
+            if best_counts is None or counts < best_counts:
+                best_counts = counts
+                images = [transform]
+            elif counts == best_counts:
+                images.append(transform)
+
+        # Packed into bytes, a key costs a few bytes per layout instead of a tuple of tuples
+        layouts = [(self.__layout_images__(layout), count.to_bytes(4, 'little')) for layout, count in state]
+        key = None
+        for transform in images:
+            candidate = b''.join(sorted(layout_images[transform] + count for layout_images, count in layouts))
+            if key is None or candidate < key:
+                key = candidate
+        return key
+
+    def __hit_counts__(self, state):
+        num_layouts = 0
+        hit_counts = [0] * self.num_cells
+        for layout, count in state:
+            num_layouts += count
+            for mask in layout:
+                while mask:
+                    low_bit = mask & -mask
+                    hit_counts[low_bit.bit_length() - 1] += count
+                    mask ^= low_bit
+        return hit_counts, num_layouts
+
+    @staticmethod
+    def __misses_bound__(num_layouts, max_count):
+        # A shot rules out at most max_count layouts, so the first i shots all miss with a probability
+        # of at least 1 - i * max_count / num_layouts. Summing over i bounds the expected misses.
+        if num_layouts == 0 or max_count == 0:
+            return 0
+        shots = (num_layouts - 1) // max_count
+        return shots - max_count / num_layouts * shots * (shots + 1) / 2
+
+    def __solve__(self, state, remaining, hit_counts=None, num_layouts=None, bound=float('inf')):
+        # A state holds every consistent layout reduced to the cells not yet shot, with multiplicity.
+        # Layouts that only differ in cells already shot can never be told apart again.
+        if remaining == 0:
+            return 0
+        if hit_counts is None:
+            hit_counts, num_layouts = self.__hit_counts__(state)
+        # Once the occupied cells are known, the remaining hits are all that is left
+        if all(count == 0 or count == num_layouts for count in hit_counts):
+            return remaining
+
+        # A guaranteed miss gives no information, so only cells that may hit are worth a shot
+        candidates = sorted((cell for cell in range(self.num_cells) if hit_counts[cell] > 0),
+                            key=lambda cell: -hit_counts[cell])
+        max_count = hit_counts[candidates[0]]
+        # Cutoffs only pay off while hunting, where the misses bound is tight. Once a ship is hit,
+        # states are solved exactly so that they are not searched again under every new bound.
+        hunting = remaining == sum(self.ship_sizes[ship_num] for ship_num, mask in enumerate(state[0][0]) if mask)
+        if not hunting:
+            bound = float('inf')
+        lower_bound = remaining + OptimalStrategySolver.__misses_bound__(num_layouts, max_count)
+        if lower_bound >= bound:
+            return lower_bound
+
+        key = self.__canonical_key__(state, hit_counts)
+        if key in self.cache:
+            self.cache_hits += 1
+            return self.cache[key]
+        # An earlier search may already have shown that this state costs more than the caller can afford
+        if self.lower_bounds.get(key, 0) >= bound:
+            self.cache_hits += 1
+            return self.lower_bounds[key]
+        self.nodes += 1
+
+        best = float('inf')
+        failed_low = float('inf')
+        for cell in candidates:
+            limit = min(best, bound)
+            # Every child still needs its remaining hits, and a miss leaves the misses bound on top
+            miss_layouts = num_layouts - hit_counts[cell]
+            expected = 1 + remaining - hit_counts[cell] / num_layouts \
+                + miss_layouts / num_layouts * OptimalStrategySolver.__misses_bound__(miss_layouts, max_count)
+            if expected >= limit:
+                self.pruned += 1
+                failed_low = min(failed_low, expected)
+                continue
+
+            cell_bit = 1 << cell
+            children = {}
+            for layout, count in state:
+                outcome = GameStatus.MARKER_MISS
+                child_layout = layout
+                for ship_num, mask in enumerate(layout):
+                    if mask & cell_bit:
+                        # Same information a player gets from add_offence_shot: hit, or the sunken ship
+                        outcome = self.ships[ship_num] if mask == cell_bit else GameStatus.MARKER_HIT
+                        child_layout = layout[:ship_num] + (mask ^ cell_bit,) + layout[ship_num + 1:]
+                        break
+                child = children.setdefault(outcome, {})
+                child[child_layout] = child.get(child_layout, 0) + count
+
+            # Tighten the bound with the children's own hit counts before searching any of them
+            expected = 1
+            child_states = []
+            for outcome, child in children.items():
+                child_state = list(child.items())
+                child_remaining = remaining if outcome == GameStatus.MARKER_MISS else remaining - 1
+                child_hit_counts, child_num_layouts = self.__hit_counts__(child_state)
+                child_lower_bound = child_remaining + OptimalStrategySolver.__misses_bound__(
+                    child_num_layouts, max(child_hit_counts)
+                )
+                weight = child_num_layouts / num_layouts
+                expected += weight * child_lower_bound
+                child_states.append(
+                    (weight, child_lower_bound, child_state, child_remaining, child_hit_counts, child_num_layouts)
+                )
+            if expected >= limit:
+                self.pruned += 1
+                failed_low = min(failed_low, expected)
+                continue
+
+            for weight, child_lower_bound, child_state, child_remaining, child_hit_counts, child_num_layouts \
+                    in child_states:
+                # Past this value the child alone would push the shot over the limit
+                child_bound = child_lower_bound + (limit - expected) / weight
+                value = self.__solve__(
+                    child_state, child_remaining, child_hit_counts, child_num_layouts, child_bound
+                )
+                expected += weight * (value - child_lower_bound)
+                if expected >= limit:
+                    self.pruned += 1
+                    failed_low = min(failed_low, expected)
+                    break
+            else:
+                best = expected
+
+        if best < bound:
+            self.cache[key] = best
+            return best
+        # Every shot costs at least the bound, which is all the caller needs to know
+        lower_bound = min(best, failed_low)
+        self.lower_bounds[key] = max(self.lower_bounds.get(key, 0), lower_bound)
+        return lower_bound
+
+    def solve(self):
+        start = time.perf_counter()
+        expected_shots = self.__solve__([(layout, 1) for layout in self.layouts], self.total_size)
+        self.wall_time += time.perf_counter() - start
+        logger.info(self.report())
+        return expected_shots
+
+    def report(self):
+        return {
+            'size': (self.game_status.size_x, self.game_status.size_y),
+            'ships': dict(self.game_status.ships_and_sizes),
+            'layouts': len(self.layouts),
+            'symmetries': self.symmetry.num_transforms(),
+            'nodes': self.nodes,
+            'cache_size': len(self.cache),
+            'lower_bound_cache_size': len(self.lower_bounds),
+            'cache_hits': self.cache_hits,
+            'pruned': self.pruned,
+            'wall_time': self.wall_time,
+        }
+
+    def layout_to_board(self, layout_id):
+        board = [GameStatus.MARKER_EMPTY] * self.num_cells
+        for ship, mask in zip(self.ships, self.layouts[layout_id]):
+            while mask:
+                low_bit = mask & -mask
+                board[low_bit.bit_length() - 1] = ship
+                mask ^= low_bit
+        return board
+
+    def score_player(self, player, seed=0):
+        # Mean shots of a player over every layout, i.e. the same uniform prior the solver optimizes
+        total_shots = 0
+        for layout_id in range(len(self.layouts)):
+            size_x = self.game_status.size_x
+            size_y = self.game_status.size_y
+            offence_status = GameStatus(size_x, size_y, self.game_status.ships_and_sizes)
+            defence_status = GameStatus(size_x, size_y, self.game_status.ships_and_sizes)
+            defence_status.set_defence_board(self.layout_to_board(layout_id))
+            player.update_game_status(offence_status)
+            player.update_rng(game_rng(seed, layout_id, ROLE_OFFENCE))
+            player.reset()
+            while not offence_status.game_over:
+                shot = player.shoot()
+                shot_result, ship_sunk, sunken_ship_type = defence_status.add_defence_shot(shot)
+                shot_idx = offence_status.add_offence_shot(shot, shot_result, ship_sunk, sunken_ship_type)
+                player.on_shot_result(shot_idx, shot_result, sunken_ship_type)
+            total_shots += offence_status.offence_turn - 1
+        return total_shots / len(self.layouts)
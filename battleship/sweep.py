@@ -0,0 +1,138 @@
+import concurrent.futures
+import functools
+import glob
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from .batch_simulator import BatchGameSimulator
+
+logger = logging.getLogger(__name__)
+
+
+def run_sweep_cell(player_class, config, seed, first_game, num_games):
+    # Runs in a worker process, so it has to be a module level function
+    simulator = BatchGameSimulator(
+        functools.partial(player_class, **config), num_simulation=num_games, seed=seed, first_game=first_game
+    )
+    start = time.perf_counter()
+    win_statistics = simulator.start()
+    elapsed = time.perf_counter() - start
+    return {'win_statistics': win_statistics, 'elapsed': elapsed}
+
+
+class ParameterSweep:
+    # Every configuration plays the same games, one cell per (configuration, range of games).
+    # Finished cells are cached by (player class, config hash, code version, seed and range of games),
+    # so a rerun only plays the cells that are missing or outdated.
+    CELL_SIZE = 100
+
+    def __init__(self, player_class, grid, num_games=1000, seed=0, num_workers=None, cache_path='sweep_cache.json'):
+        self.player_class = player_class
+        self.grid = grid  # Keyword argument of the player -> values to try
+        self.num_games = num_games
+        self.seed = seed
+        self.num_workers = num_workers
+        self.cache_path = cache_path
+        self.cache = {}
+        self.results = {}
+        self.code_version = ParameterSweep.get_code_version()
+
+    @staticmethod
+    def get_code_version():
+        # Any change to the package sources invalidates cached results
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(os.path.dirname(__file__), '*.py'))):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def get_config_hash(config):
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+    def get_configs(self):
+        names = sorted(self.grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(self.grid[name] for name in names))]
+
+    def get_cells(self):
+        cells = []
+        for first_game in range(0, self.num_games, ParameterSweep.CELL_SIZE):
+            cells.append((first_game, min(ParameterSweep.CELL_SIZE, self.num_games - first_game)))
+        return cells
+
+    def get_cache_key(self, config, first_game, num_games):
+        return f"{self.player_class.__name__}:{ParameterSweep.get_config_hash(config)}:{self.code_version}:" \
+               f"{self.seed}:{first_game}-{first_game + num_games}"
+
+    def load_cache(self):
+        if self.cache_path is not None and os.path.exists(self.cache_path):
+            with open(self.cache_path) as f:
+                self.cache = json.load(f)
+
+    def save_cache(self):
+        if self.cache_path is None:
+            return
+        # Written aside and renamed, so an interrupted sweep never leaves a broken cache
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.cache, f)
+        os.replace(temp_path, self.cache_path)
+
+    def start(self):
+        logger.info('ParameterSweep starts.')
+        self.load_cache()
+        configs = self.get_configs()
+        cells = self.get_cells()
+
+        missing = []
+        for config in configs:
+            for first_game, num_games in cells:
+                key = self.get_cache_key(config, first_game, num_games)
+                if key not in self.cache:
+                    missing.append((key, config, first_game, num_games))
+        logger.info(f"{len(configs)} configs x {len(cells)} cells, {len(missing)} to run")
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+            futures = {
+                executor.submit(run_sweep_cell, self.player_class, config, self.seed, first_game, num_games): key
+                for key, config, first_game, num_games in missing
+            }
+            for future in concurrent.futures.as_completed(futures):
+                self.cache[futures[future]] = future.result()
+                self.save_cache()
+
+        self.results = {}
+        for config in configs:
+            win_statistics = [0] * 100
+            elapsed = 0
+            for first_game, num_games in cells:
+                cell = self.cache[self.get_cache_key(config, first_game, num_games)]
+                win_statistics = [total + count for total, count in zip(win_statistics, cell['win_statistics'])]
+                elapsed += cell['elapsed']
+            self.results[ParameterSweep.get_config_hash(config)] = (config, win_statistics, elapsed)
+
+        logger.info('ParameterSweep ends.')
+        return self.report()
+
+    def report(self):
+        # Ranked by mean turns to win, throughput is per worker process
+        rows = []
+        for config, win_statistics, elapsed in self.results.values():
+            num_games = sum(win_statistics)
+            mean_turns = sum((turns + 1) * count for turns, count in enumerate(win_statistics)) / num_games
+            rows.append({
+                'config': config,
+                'games': num_games,
+                'mean_turns': mean_turns,
+                'games_per_second': num_games / elapsed if elapsed > 0 else 0,
+            })
+        rows.sort(key=lambda row: row['mean_turns'])
+        return rows
+
+    def print_report(self):
+        print(f"{'#':>3} {'mean turns':>10} {'games/s':>10}  config")
+        for rank, row in enumerate(self.report()):
+            print(f"{rank + 1:>3} {row['mean_turns']:>10.3f} {row['games_per_second']:>10.1f}  {row['config']}")
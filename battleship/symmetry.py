@@ -0,0 +1,123 @@
+import operator
+from .game_status import GameStatus
+
+
+class BoardSymmetry:
+    # Transforms are (x, y) -> (x', y') maps. Only the first four keep a rectangular board in place.
+    IDENTITY = 0
+    FLIP_X = 1
+    FLIP_Y = 2
+    ROTATE_180 = 3
+    TRANSPOSE = 4
+    ROTATE_90 = 5
+    ROTATE_270 = 6
+    ANTI_TRANSPOSE = 7
+
+    def __init__(self, size_x, size_y):
+        self.game_status = GameStatus(size_x, size_y)
+        self.num_cells = size_x * size_y
+
+        self.perms = []  # perms[t][idx] is where idx goes under transform t
+        for transform in self.__transforms__():
+            perm = []
+            for idx in range(self.num_cells):
+                x, y = self.game_status.__idx_to_xy__(idx)
+                perm.append(self.game_status.__xy_to_idx__(*transform(x, y)))
+            self.perms.append(perm)
+
+        self.inverse_perms = []
+        for perm in self.perms:
+            inverse_perm = [0] * self.num_cells
+            for idx, transformed_idx in enumerate(perm):
+                inverse_perm[transformed_idx] = idx
+            self.inverse_perms.append(inverse_perm)
+
+        # Gathering a transformed board through itemgetter keeps the per-turn cost in C
+        self.getters = [operator.itemgetter(*inverse_perm) for inverse_perm in self.inverse_perms]
+        self.mask_tables = self.__mask_tables__()
+
+    def __transforms__(self):
+        size_x = self.game_status.size_x
+        size_y = self.game_status.size_y
+        transforms = [
+            lambda x, y: (x, y),
+            lambda x, y: (size_x - 1 - x, y),
+            lambda x, y: (x, size_y - 1 - y),
+            lambda x, y: (size_x - 1 - x, size_y - 1 - y),
+        ]
+        if size_x == size_y:
+            transforms += [
+                lambda x, y: (y, x),
+                lambda x, y: (y, size_x - 1 - x),
+                lambda x, y: (size_y - 1 - y, x),
+                lambda x, y: (size_y - 1 - y, size_x - 1 - x),
+            ]
+        return transforms
+
+    def __mask_tables__(self):
+        # Transforming a bit mask one byte at a time keeps canonicalization cheap
+        tables = []
+        for perm in self.perms:
+            chunks = []
+            for chunk_start in range(0, self.num_cells, 8):
+                chunk = []
+                for byte in range(256):
+                    transformed = 0
+                    for bit in range(8):
+                        if byte >> bit & 1 and chunk_start + bit < self.num_cells:
+                            transformed |= 1 << perm[chunk_start + bit]
+                    chunk.append(transformed)
+                chunks.append(chunk)
+            tables.append(chunks)
+        return tables
+
+    def num_transforms(self):
+        return len(self.perms)
+
+    def transform_board(self, board, transform):
+        return list(self.getters[transform](board))
+
+    def transform_idx(self, idx, transform):
+        return self.perms[transform][idx]
+
+    def inverse_transform_idx(self, idx, transform):
+        return self.inverse_perms[transform][idx]
+
+    def transform_mask(self, mask, transform):
+        transformed = 0
+        for chunk in self.mask_tables[transform]:
+            transformed |= chunk[mask & 0xff]
+            mask >>= 8
+        return transformed
+
+    def canonicalize(self, board):
+        # The lexicographically smallest image is the canonical one.
+        # Returns it as a string, with the transform that maps the board onto it.
+        canonical = None
+        canonical_transform = BoardSymmetry.IDENTITY
+        for transform, getter in enumerate(self.getters):
+            image = ''.join(getter(board))
+            if canonical is None or image < canonical:
+                canonical = image
+                canonical_transform = transform
+        return canonical, canonical_transform
+
+    def canonicalize_placements(self, placements):
+        # Placements are bit masks of cell indices, e.g. one per ship of a layout
+        canonical = None
+        canonical_transform = BoardSymmetry.IDENTITY
+        for transform in range(len(self.perms)):
+            image = tuple(sorted(self.transform_mask(placement, transform) for placement in placements))
+            if canonical is None or image < canonical:
+                canonical = image
+                canonical_transform = transform
+        return canonical, canonical_transform
+
+    def to_canonical_shot(self, shot, transform):
+        idx = self.game_status.__shot_to_idx__(shot)
+        return self.game_status.__idx_to_shot__(self.perms[transform][idx])
+
+    def from_canonical_shot(self, shot, transform):
+        # Maps a shot chosen on the canonical board back onto the board that was canonicalized
+        idx = self.game_status.__shot_to_idx__(shot)
+        return self.game_status.__idx_to_shot__(self.inverse_perms[transform][idx])
@@ -0,0 +1,133 @@
+import csv
+import logging
+import math
+import time
+from .exception import ShotDeadlineExceededException
+from .game_status import GameStatus
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    # Log-scaled buckets keep memory bounded for long runs (~5% relative error per bucket)
+    BUCKET_GROWTH = 1.05
+    MIN_LATENCY_NS = 1000
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, latency_ns):
+        if latency_ns < LatencyHistogram.MIN_LATENCY_NS:
+            bucket = 0
+        else:
+            bucket = 1 + int(math.log(latency_ns / LatencyHistogram.MIN_LATENCY_NS, LatencyHistogram.BUCKET_GROWTH))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total_ns += latency_ns
+        if latency_ns > self.max_ns:
+            self.max_ns = latency_ns
+
+    def merge(self, other):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def percentile(self, p):
+        if self.count == 0:
+            return 0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # Upper bound of the bucket, never above the exact maximum
+                upper = LatencyHistogram.MIN_LATENCY_NS * LatencyHistogram.BUCKET_GROWTH ** bucket
+                return min(upper, self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        # All latencies in milliseconds
+        return {
+            'count': self.count,
+            'mean': self.total_ns / self.count / 1e6 if self.count > 0 else 0,
+            'p50': self.percentile(50) / 1e6,
+            'p95': self.percentile(95) / 1e6,
+            'p99': self.percentile(99) / 1e6,
+            'max': self.max_ns / 1e6,
+        }
+
+
+class ShotTelemetry:
+    DEADLINE_POLICY_IGNORE = 'ignore'  # Accept the late shot, only count the overrun
+    DEADLINE_POLICY_RANDOM = 'random'  # Replace the late shot with a random empty target
+    DEADLINE_POLICY_RAISE = 'raise'  # Abort the game with ShotDeadlineExceededException
+    DEADLINE_POLICIES = [DEADLINE_POLICY_IGNORE, DEADLINE_POLICY_RANDOM, DEADLINE_POLICY_RAISE]
+
+    def __init__(self, shot_deadline=None, deadline_policy=DEADLINE_POLICY_IGNORE):
+        if deadline_policy not in ShotTelemetry.DEADLINE_POLICIES:
+            raise ValueError(f"Unknown deadline policy, {deadline_policy}")
+        self.shot_deadline = shot_deadline
+        self.deadline_policy = deadline_policy
+        self.histograms = {}
+        self.deadline_misses = {}
+
+    def timed_shoot(self, player):
+        start = time.perf_counter_ns()
+        shot = player.shoot()
+        elapsed_ns = time.perf_counter_ns() - start
+        return self.__record__(player, shot, elapsed_ns)
+
+    def timed_shoot_batch(self, players):
+        # Batched decisions are only timed as a whole, so every shot is charged its amortized share
+        start = time.perf_counter_ns()
+        shots = players[0].__class__.shoot_batch(players)
+        elapsed_ns = (time.perf_counter_ns() - start) // len(players)
+        return [self.__record__(player, shot, elapsed_ns) for player, shot in zip(players, shots)]
+
+    def __record__(self, player, shot, elapsed_ns):
+        name = player.__class__.__name__
+        if name not in self.histograms:
+            self.histograms[name] = LatencyHistogram()
+            self.deadline_misses[name] = 0
+        self.histograms[name].record(elapsed_ns)
+
+        if self.shot_deadline is not None and elapsed_ns > self.shot_deadline * 1e9:
+            self.deadline_misses[name] += 1
+            if self.deadline_policy == ShotTelemetry.DEADLINE_POLICY_RAISE:
+                raise ShotDeadlineExceededException(
+                    f"{name} took {elapsed_ns / 1e6:.3f} ms, deadline is {self.shot_deadline * 1e3:.3f} ms"
+                )
+            elif self.deadline_policy == ShotTelemetry.DEADLINE_POLICY_RANDOM:
+                late_shot = shot
+                shot = ShotTelemetry.random_empty_shot(player.game_status, player.rng)
+                player.forfeit_shot(late_shot, shot)
+                logger.debug(f"{name} missed the deadline, '{late_shot}' replaced by '{shot}'")
+
+        return shot
+
+    @staticmethod
+    def random_empty_shot(game_status: GameStatus, rng):
+        candidates = [idx for idx, marker in enumerate(game_status.offence_board) if marker == GameStatus.MARKER_EMPTY]
+        return game_status.__idx_to_shot__(rng.choice(candidates))
+
+    def export(self):
+        stats = {}
+        for name, histogram in self.histograms.items():
+            stats[name] = histogram.summary()
+            stats[name]['deadline_misses'] = self.deadline_misses[name]
+        return stats
+
+    def export_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['player', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'deadline_misses'])
+            for name, stats in self.export().items():
+                writer.writerow([
+                    name, stats['count'], stats['mean'], stats['p50'], stats['p95'], stats['p99'], stats['max'],
+                    stats['deadline_misses'],
+                ])
@@ -0,0 +1,9 @@
+import logging
+from battleship.distributed import *
+from battleship.player import *
+
+logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+
+# Workers on other hosts connect with distributed_worker.py
+coordinator = DistributedCoordinator(ProbabilityPlayer, num_simulation=10000, seed=777, host='0.0.0.0')
+coordinator.start()
@@ -0,0 +1,11 @@
+import logging
+import sys
+from battleship.distributed import *
+
+logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+
+# python distributed_worker.py [coordinator host] [port]
+host = sys.argv[1] if len(sys.argv) > 1 else 'localhost'
+port = int(sys.argv[2]) if len(sys.argv) > 2 else DistributedCoordinator.PORT
+worker = DistributedWorker(host, port)
+worker.start()
@@ -0,0 +1,9 @@
+from battleship.game_simulator import *
+from battleship.player import *
+
+# Every shot of the first games as PNG frames, without a display
+game = SingleOffenceGameSimulator(
+    ProbabilityPlayer(), num_simulation=3, seed=777,
+    render_mode=SingleOffenceGameSimulator.RENDER_MODE_OFFSCREEN, frame_dir='frames', drop_frames=False
+)
+game.start()
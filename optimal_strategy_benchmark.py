@@ -0,0 +1,13 @@
+import logging
+from battleship.solver import *
+from battleship.player import *
+
+logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+
+for solver in [
+    OptimalStrategySolver(),
+    OptimalStrategySolver(4, 4, {GameStatus.MARKER_PATROL_BOAT: 2, GameStatus.MARKER_DESTROYER: 3}),
+]:
+    logging.info(f"Optimal: {solver.solve()}")
+    for player in [SequentialPlayer(), HuntAndTargetPlayer(), ProbabilityPlayer()]:
+        logging.info(f"{player.__class__.__name__}: {solver.score_player(player)}")
@@ -0,0 +1,20 @@
+import logging
+from battleship.player import *
+from battleship.sweep import ParameterSweep
+
+logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+
+# Worker processes import this script again, so the sweep only runs from the main module
+if __name__ == '__main__':
+    sweep = ParameterSweep(
+        ProbabilityPlayer,
+        {
+            'tie_break': ProbabilityPlayer.TIE_BREAKS,
+            'parity': [False, True],
+            'targeting_budget': [100, ProbabilityPlayer.TARGETING_BUDGET],
+        },
+        num_games=1000,
+        seed=777,
+    )
+    sweep.start()
+    sweep.print_report()